@@ -0,0 +1,73 @@
+#!/bin/env python
+# Load and save throughput of the schema codec against dumping objects with
+# the pure-Python yaml.Loader, as the store used to.
+#   python benchmarks/yaml_codec.py [count ...]
+import os
+import random
+import sys
+import tempfile
+import time
+import yaml
+from datetime import date, timedelta
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__),
+                                                '..')))
+from cash_flow.transaction import Transaction  # noqa: E402
+from cash_flow import yaml_codec  # noqa: E402
+
+
+def makeTransactions(count):
+    rng = random.Random(1)
+    frequencies = [Transaction.ONCE, Transaction.WEEKLY,
+                   Transaction.BIWEEKLY, Transaction.MONTHLY]
+    start = date(2021, 1, 1)
+    return [Transaction(start=start + timedelta(days=rng.randint(0, 365)),
+                        description=f"Transaction {i}",
+                        amount=rng.randint(-100000, 100000) / 100,
+                        frequency=rng.choice(frequencies),
+                        skip=set([start + timedelta(days=rng.randint(0, 60))]))
+            for i in range(count)]
+
+
+def timed(function, *args):
+    began = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - began
+
+
+def legacySave(path, transactions):
+    with open(path, "w") as f:
+        yaml.dump(transactions, f)
+
+
+def legacyLoad(path):
+    with open(path, "r") as f:
+        return yaml.load(f, Loader=yaml.Loader)
+
+
+def codecSave(path, transactions):
+    with open(path, "w") as f:
+        yaml_codec.dumpTransactions(transactions, f)
+
+
+def codecLoad(path):
+    with open(path, "r") as f:
+        return yaml_codec.loadTransactions(f)
+
+
+def main(counts):
+    print(f"libyaml: {getattr(yaml, '__with_libyaml__', False)}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'transactions.yml')
+        for count in counts:
+            transactions = makeTransactions(count)
+            for (name, save, load) in (("yaml.dump/yaml.Loader",
+                                        legacySave, legacyLoad),
+                                       ("yaml_codec", codecSave, codecLoad)):
+                saving = timed(save, path, transactions)
+                loading = timed(load, path)
+                print(f"{count:>7} {name:<22} save {saving:7.2f}s "
+                      f"load {loading:7.2f}s")
+
+
+if __name__ == '__main__':
+    main([int(c) for c in sys.argv[1:]] or [10000, 100000])
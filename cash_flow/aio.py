@@ -0,0 +1,81 @@
+#!/bin/env python
+
+import asyncio
+from datetime import timedelta
+from cash_flow.projection import Projection
+from cash_flow.transaction_store import (
+    readTransactions, writeTransactions, snapshotTransactions)
+
+
+# Async counterparts of the blocking entry points, for use inside an
+# event loop. The store is only ever read or changed on the loop's
+# thread; parsing, serializing and projecting run in executor (the
+# loop's default executor when None).
+
+
+async def project(cash_flow, start=None, horizon_days=365, executor=None):
+    # CashFlow.project with the number crunching off the loop. The set of
+    # transactions is taken when called; projection.version says which
+    # store version that was, so sync() picks up anything changed since.
+    # The projection holds copies of the transactions as they were then.
+    if start is None:
+        start = cash_flow.start_date
+    return await _project(cash_flow.transaction_store, start,
+                          cash_flow.start_balance, horizon_days, executor)
+
+
+async def transactionDays(cash_flow, horizon_days=365, start=None,
+                          chunk_days=92, executor=None):
+    # Async iterator of the (date, balance, transactions) tuples
+    # Projection.transactionDays gives, projected chunk_days at a time so
+    # other tasks get to run between chunks.
+    if start is None:
+        start = cash_flow.start_date
+    balance = cash_flow.start_balance
+    for offset in range(0, horizon_days, chunk_days):
+        length = min(chunk_days, horizon_days - offset)
+        first = start + timedelta(days=offset)
+        projection = await _project(cash_flow.transaction_store, first,
+                                    balance, length, executor)
+        for day in projection.transactionDays():
+            yield day
+        balance = projection.balanceOn(first + timedelta(days=length - 1))
+
+
+async def loadTransactions(store, file, executor=None):
+    # TransactionStore.loadTransactions with the file read and parsed off
+    # the loop; the store is only touched once parsing has succeeded.
+    loop = asyncio.get_running_loop()
+    try:
+        transactions = await loop.run_in_executor(executor,
+                                                  readTransactions, file)
+    except Exception:
+        print(f"Failed to load transaction store from {file}.")
+        return
+    store.replaceAll(transactions)
+
+
+async def saveTransactions(store, file, executor=None):
+    # TransactionStore.saveTransactions from a snapshot taken on the loop,
+    # so later changes can't leak into a half-written file
+    snapshot = snapshotTransactions(store.getTransactions())
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(executor, writeTransactions, file,
+                                   snapshot)
+    except Exception:
+        print(f"Failed to save transactions to {file}.")
+
+
+async def _project(store, start, start_balance, horizon_days, executor):
+    # Copies, so edits made while projecting can't reach the executor
+    last = start + timedelta(days=horizon_days - 1)
+    transactions = snapshotTransactions(
+        store.getActiveTransactions(start, last))
+    version = store.version
+    loop = asyncio.get_running_loop()
+    projection = await loop.run_in_executor(
+        executor, Projection, start, start_balance, transactions,
+        horizon_days)
+    projection.version = version
+    return projection
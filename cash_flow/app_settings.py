@@ -0,0 +1,21 @@
+#!/bin/env python
+from datetime import date
+
+
+class AppSettings():
+    def __init__(self, startDate=None, startBalance=None, warning=None, dataFile=None):
+        if startDate is None:
+            startDate = date.today()
+        self.startDate = startDate
+
+        if startBalance is None:
+            startBalance = '0.00'
+        self.startBalance = startBalance
+
+        if warning is None:
+            warning = 100.00
+        self.warning = warning
+
+        if dataFile is None:
+            dataFile = ""
+        self.dataFile = dataFile
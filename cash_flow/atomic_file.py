@@ -0,0 +1,40 @@
+#!/bin/env python
+
+import os
+import uuid
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomicOpen(path, mode="w"):
+    # Writes go to a temporary file beside path, which replaces path only
+    # once everything has been written and flushed to disk. If anything
+    # fails, path is left as it was. A new file gets the mode open() would
+    # give it, an existing one keeps its own.
+    (fd, temporary) = _createTemporary(path)
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            os.chmod(temporary, os.stat(path).st_mode & 0o7777)
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+
+def _createTemporary(path):
+    # Like tempfile.mkstemp, but created 0666 so the kernel applies the
+    # umask; reading the umask would mean briefly changing it for every
+    # thread in the process
+    flags = (os.O_RDWR | os.O_CREAT | os.O_EXCL |
+             getattr(os, 'O_BINARY', 0))
+    while True:
+        temporary = f"{os.path.abspath(path)}.{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            return (os.open(temporary, flags, 0o666), temporary)
+        except FileExistsError:
+            continue
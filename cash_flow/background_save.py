@@ -0,0 +1,96 @@
+#!/bin/env python
+
+import threading
+
+
+class BackgroundSaver(object):
+    # Runs saves one at a time on a worker thread. A save is submitted as
+    # prepare, a function called on the submitting thread just before the
+    # save starts; it takes whatever snapshot it needs and returns a job
+    # doing the file I/O, which runs on the worker. Saves submitted under
+    # a key that is already waiting collapse into the waiting one, which
+    # snapshots the latest state when its turn comes.
+    #
+    # call_after(function, *args) must run function back on the
+    # submitting thread, e.g. wx.CallAfter; on_done(key, error) is called
+    # there after each save, with error None on success. A waiting save
+    # only starts once call_after has handed back the one before it, so
+    # flush() must be called before the submitting thread stops running
+    # those, e.g. when the window closes.
+    def __init__(self, call_after, on_done=None):
+        self.call_after = call_after
+        self.on_done = on_done
+        # keys waiting to be saved -> prepare, in submission order
+        self.waiting = {}
+        self.running = None
+        # Thread doing the running save, and the error it finished with
+        self._worker = None
+        self._error = None
+        self._idle = threading.Event()
+        self._idle.set()
+
+    @property
+    def busy(self):
+        return self.running is not None or bool(self.waiting)
+
+    def submit(self, key, prepare):
+        if key not in self.waiting:
+            self.waiting[key] = prepare
+        self._idle.clear()
+        if self.running is None:
+            self._startNext()
+
+    def pending(self, key):
+        # Whether a save under key is waiting or running
+        return key in self.waiting or self.running == key
+
+    def wait(self, timeout=None):
+        # Blocks until every submitted save has finished
+        return self._idle.wait(timeout)
+
+    def flush(self):
+        # Runs every submitted save to the end on the submitting thread,
+        # without waiting for call_after to hand each one back
+        while self.busy:
+            worker = self._worker
+            if worker is None:
+                self._startNext()
+                continue
+            worker.join()
+            self._finished(worker, self.running, self._error)
+
+    def _startNext(self):
+        if not self.waiting:
+            self._idle.set()
+            return
+        key = next(iter(self.waiting))
+        prepare = self.waiting.pop(key)
+        self.running = key
+        self._worker = None
+        try:
+            job = prepare()
+        except Exception as error:
+            self._finished(None, key, error)
+            return
+        self._worker = threading.Thread(target=self._run, args=(key, job))
+        self._worker.start()
+
+    def _run(self, key, job):
+        error = None
+        try:
+            job()
+        except Exception as e:
+            error = e
+        self._error = error
+        self.call_after(self._finished, threading.current_thread(), key,
+                        error)
+
+    def _finished(self, worker, key, error):
+        if worker is not self._worker:
+            # Already finished by flush()
+            return
+        self._worker = None
+        self.running = None
+        if self.on_done is not None:
+            self.on_done(key, error)
+        self._startNext()
@@ -0,0 +1,59 @@
+#!/bin/env python
+
+import numpy as np
+from bisect import bisect_right
+from datetime import timedelta
+from cash_flow.money import Money
+from cash_flow.projection import occurrenceDays
+
+
+class BalanceCheckpoints(object):
+    # Balance lookups for any day in [start_date, last_date]. Every event
+    # in the range is kept sorted by day, along with the balance at the
+    # start of each month. A lookup finds the month's checkpoint with a
+    # bisect and adds up the events since then.
+    def __init__(self, start_date, start_balance, transactions, last_date):
+        self.start_date = start_date
+        self.last_date = last_date
+        horizon_days = (last_date - start_date).days + 1
+        day_parts = []
+        cent_parts = []
+        for t in transactions:
+            days = occurrenceDays(t, start_date, horizon_days)
+            if len(days) and t.amount.cents:
+                day_parts.append(days)
+                cent_parts.append(np.full(len(days), t.amount.cents,
+                                          dtype=np.int64))
+        if day_parts:
+            days = np.concatenate(day_parts)
+            order = np.argsort(days, kind='stable')
+            self.event_days = days[order]
+            self.event_cents = np.concatenate(cent_parts)[order]
+        else:
+            self.event_days = np.zeros(0, dtype=np.int64)
+            self.event_cents = np.zeros(0, dtype=np.int64)
+
+        # Checkpoint i: balance before any event on checkpoint_days[i]
+        self.checkpoint_days = [0]
+        month = start_date.replace(day=1)
+        while True:
+            month = (month + timedelta(days=32)).replace(day=1)
+            if month > last_date:
+                break
+            self.checkpoint_days.append((month - start_date).days)
+        self.checkpoint_events = np.searchsorted(
+            self.event_days, self.checkpoint_days, side='left')
+        running = np.concatenate(([0], np.cumsum(self.event_cents)))
+        self.checkpoint_balances = (Money(start_balance).cents +
+                                    running[self.checkpoint_events])
+
+    def balanceOn(self, d):
+        day = (d - self.start_date).days
+        if day < 0 or d > self.last_date:
+            raise ValueError(f"{d} is outside {self.start_date} to "
+                             f"{self.last_date}")
+        checkpoint = bisect_right(self.checkpoint_days, day) - 1
+        first = self.checkpoint_events[checkpoint]
+        last = np.searchsorted(self.event_days, day, side='right')
+        return Money.fromCents(self.checkpoint_balances[checkpoint] +
+                               self.event_cents[first:last].sum())
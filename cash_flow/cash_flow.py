@@ -1,19 +1,31 @@
 #!/bin/env python
 
+import heapq
 from datetime import date, timedelta
 from dateutil.relativedelta import relativedelta
 from cash_flow.transaction import Transaction
 from cash_flow.transaction_store import TransactionStore
 from cash_flow.money import Money
+from cash_flow.projection import Projection
+from cash_flow.balance_checkpoints import BalanceCheckpoints
+from cash_flow.scenario import evaluateScenarios
+from cash_flow.monte_carlo import monteCarlo
+from cash_flow.export import exportProjection, CSV
+from cash_flow.parallel import projectBalances
 
 
 class CashFlow(object):
+    # How far past start_date balanceOn indexes to begin with
+    CHECKPOINT_DAYS = 5 * 366
+
     def __init__(self, start_date, start_balance, transaction_store):
         self.start_date = start_date
         self.start_balance = Money(start_balance)
         self.transaction_store = transaction_store
         self.current_date = start_date
         self.current_balance = Money(start_balance)
+        self._checkpoints = None
+        self._checkpoints_version = None
 
     def getTodaysTransactions(self):
         while(True):
@@ -25,3 +37,100 @@ class CashFlow(object):
                     self.current_balance += amt
             yield (self.current_date, self.current_balance, daily_transactions)
             self.current_date += timedelta(days=1)
+
+    def project(self, start=None, horizon_days=365):
+        if start is None:
+            start = self.start_date
+        last = start + timedelta(days=horizon_days - 1)
+        projection = Projection(start, self.start_balance,
+                                self.transaction_store.getActiveTransactions(
+                                    start, last),
+                                horizon_days)
+        projection.version = self.transaction_store.version
+        return projection
+
+    def projectBalances(self, start=None, horizon_days=365, workers=None,
+                        shard_size=1000):
+        # Projection balances in cents, computed across worker processes;
+        # see parallel.projectBalances
+        if start is None:
+            start = self.start_date
+        return projectBalances(self.transaction_store, start,
+                               self.start_balance, horizon_days, workers,
+                               shard_size)
+
+    def projectScenarios(self, scenarios, start=None, horizon_days=365):
+        # (scenario x day) balance matrix in cents; see evaluateScenarios
+        return evaluateScenarios(self.project(start, horizon_days),
+                                 scenarios)
+
+    def monteCarlo(self, trials=10000, warning=100.00, seed=None,
+                   start=None, horizon_days=365, workers=None):
+        # Balance percentiles and shortfall odds given each transaction's
+        # amount_stddev and date_jitter; see monte_carlo.monteCarlo
+        return monteCarlo(self.project(start, horizon_days), trials=trials,
+                          warning=warning, seed=seed, workers=workers)
+
+    def exportProjection(self, out, horizon_days, format=CSV, **kwargs):
+        # Streams the projection to a file in chunks; see
+        # export.exportProjection
+        return exportProjection(self, out, horizon_days, format, **kwargs)
+
+    def balanceOn(self, d):
+        return self.balancesAt([d])[0]
+
+    def balancesAt(self, dates):
+        # End-of-day balances, as getTodaysTransactions would report them,
+        # for any dates on or after start_date. The checkpoints behind this
+        # are built once per store version and grown as later dates are
+        # asked for.
+        dates = list(dates)
+        if not dates:
+            return []
+        last = max(dates)
+        checkpoints = self._checkpoints
+        if (checkpoints is None or last > checkpoints.last_date or
+                self._checkpoints_version != self.transaction_store.version):
+            days = self.CHECKPOINT_DAYS
+            if checkpoints is not None:
+                days = max(days, 2 * (checkpoints.last_date -
+                                      self.start_date).days)
+            last = max(last, self.start_date + timedelta(days=days))
+            checkpoints = BalanceCheckpoints(
+                self.start_date, self.start_balance,
+                self.transaction_store.getActiveTransactions(
+                    self.start_date, last),
+                last)
+            self._checkpoints = checkpoints
+            self._checkpoints_version = self.transaction_store.version
+        return [checkpoints.balanceOn(d) for d in dates]
+
+    def getTransactionDays(self, end_date=None):
+        # Same contract as getTodaysTransactions, but only days that have
+        # transactions are visited, driven by a heap of each transaction's
+        # next occurrence. Ties go to store order.
+        queue = []
+        transactions = self.transaction_store.getTransactions()
+        for order, trans in enumerate(transactions):
+            occurrences = trans.occurrencesBetween(self.current_date,
+                                                   end_date)
+            self._queueNext(queue, order, trans, occurrences)
+        while queue:
+            day = queue[0][0]
+            daily_transactions = []
+            while queue and queue[0][0] == day:
+                (_, order, amt, trans, occurrences) = heapq.heappop(queue)
+                if amt != 0:
+                    daily_transactions.append(trans)
+                    self.current_balance += amt
+                self._queueNext(queue, order, trans, occurrences)
+            if daily_transactions:
+                self.current_date = day
+                yield (self.current_date, self.current_balance,
+                       daily_transactions)
+
+    def _queueNext(self, queue, order, trans, occurrences):
+        occurrence = next(occurrences, None)
+        if occurrence is not None:
+            (day, amt) = occurrence
+            heapq.heappush(queue, (day, order, amt, trans, occurrences))
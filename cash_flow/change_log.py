@@ -0,0 +1,180 @@
+#!/bin/env python
+
+import json
+import os
+from datetime import date
+from cash_flow import yaml_codec
+from cash_flow.transaction_store import (
+    readSnapshot, writeTransactions, snapshotTransactions)
+
+
+class ChangeLog(object):
+    # Saves store as a YAML snapshot at path plus an append-only log of
+    # changes at path + '.log', one JSON record per line:
+    #   {"generation": 3}                     first line
+    #   {"put": {...transaction fields...}}   added or modified
+    #   {"del": "<id>"}                       removed
+    # save() appends a record for each transaction changed since the last
+    # save, however many times it changed, so its cost follows the number
+    # of changes rather than the size of the store. Once the log grows
+    # past compact_bytes, save() writes a fresh snapshot instead and
+    # removes the log. Each snapshot has the next generation number and
+    # load() only replays a log of the snapshot's generation, so a log
+    # left behind by a crash between the two steps, whose records are
+    # older than the snapshot, can't roll it back.
+    # prepareSave() splits a save into the part that reads the store and
+    # a job doing the file I/O, which may then run on another thread.
+    COMPACT_BYTES = 1024 * 1024
+
+    def __init__(self, store, path, compact_bytes=COMPACT_BYTES):
+        self.store = store
+        self.path = path
+        self.log_path = path + '.log'
+        self.compact_bytes = compact_bytes
+        # ids changed since the last save, in the order first changed
+        self.pending = {}
+        # Bytes in the log, and whether a full snapshot is needed, as of
+        # the last prepared save
+        self.log_bytes = self.logSize()
+        self.needs_snapshot = True
+        # Generation of the snapshot the log follows
+        self.generation = 0
+        self._loading = False
+        store.subscribe(self._storeChanged)
+
+    def close(self):
+        self.store.unsubscribe(self._storeChanged)
+
+    def load(self):
+        # Replaces the store's contents with the snapshot plus the log
+        transactions = {}
+        generation = 0
+        log_generation = 0
+        truncated = False
+        if os.path.exists(self.path):
+            (snapshot, generation) = readSnapshot(self.path)
+            transactions = {t.id: t for t in snapshot}
+        if os.path.exists(self.log_path):
+            with open(self.log_path, "r") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A record cut short by a crash mid-append
+                        truncated = True
+                        break
+                    if 'generation' in record:
+                        log_generation = record['generation']
+                    elif log_generation != generation:
+                        # Already folded into the snapshot
+                        break
+                    elif 'put' in record:
+                        t = _decode(record['put'])
+                        transactions[t.id] = t
+                    else:
+                        transactions.pop(record['del'], None)
+        self._loading = True
+        try:
+            self.store.replaceAll(transactions.values())
+        finally:
+            self._loading = False
+        self.pending = {}
+        self.log_bytes = self.logSize()
+        self.generation = generation or 0
+        # A stale log is replaced by the next snapshot, as is an unversioned
+        # one, since records logged against this load's ids would come back
+        # as copies beside the next load's
+        self.needs_snapshot = (not os.path.exists(self.path) or
+                               generation is None or
+                               log_generation != generation)
+        if truncated:
+            # Don't append after the broken record
+            self.compact()
+
+    def save(self):
+        self.prepareSave()()
+
+    def compact(self):
+        # Folds everything into a new snapshot and starts an empty log
+        self.prepareCompact()()
+
+    def prepareSave(self):
+        if self.needs_snapshot or self.log_bytes >= self.compact_bytes:
+            return self.prepareCompact()
+        lines = []
+        for transaction_id in self.pending:
+            t = self.store.getTransactionById(transaction_id)
+            if t is None:
+                record = {'del': transaction_id}
+            else:
+                record = {'put': _encode(t)}
+            lines.append(_line(record))
+        if lines and self.log_bytes == 0:
+            lines.insert(0, _line({'generation': self.generation}))
+        self.pending = {}
+        self.log_bytes += sum(len(line.encode()) for line in lines)
+        return self._job(self._append, lines)
+
+    def prepareCompact(self):
+        snapshot = snapshotTransactions(self.store.getTransactions())
+        self.pending = {}
+        self.needs_snapshot = False
+        self.log_bytes = 0
+        self.generation += 1
+        return self._job(self._writeSnapshot, snapshot, self.generation)
+
+    def _job(self, function, *arguments):
+        def job():
+            try:
+                function(*arguments)
+            except BaseException:
+                # What was on disk is unknown; start over next time
+                self.needs_snapshot = True
+                raise
+        return job
+
+    def _append(self, lines):
+        if not lines:
+            return
+        with open(self.log_path, "a") as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _writeSnapshot(self, transactions, generation):
+        writeTransactions(self.path, transactions, generation)
+        if os.path.exists(self.log_path):
+            os.remove(self.log_path)
+
+    def logSize(self):
+        if not os.path.exists(self.log_path):
+            return 0
+        return os.path.getsize(self.log_path)
+
+    def _storeChanged(self, store, change):
+        if not self._loading:
+            self.pending.setdefault(change.transaction_id, True)
+
+
+DATE_FIELDS = ('start', 'original_start', 'end')
+
+
+def _line(record):
+    return json.dumps(record, separators=(',', ':')) + '\n'
+
+
+def _encode(t):
+    fields = yaml_codec.transactionToDict(t)
+    for name in DATE_FIELDS:
+        if fields[name] is not None:
+            fields[name] = fields[name].isoformat()
+    fields['skip'] = [d.isoformat() for d in fields['skip']]
+    return fields
+
+
+def _decode(fields):
+    for name in DATE_FIELDS:
+        if fields.get(name) is not None:
+            fields[name] = date.fromisoformat(fields[name])
+    fields['skip'] = [date.fromisoformat(d) for d in fields.get('skip', [])]
+    return yaml_codec.transactionFromDict(fields)
@@ -0,0 +1,84 @@
+#!/bin/env python
+
+import csv
+import json
+from datetime import timedelta
+from cash_flow.projection import Projection
+
+
+CSV = 'csv'
+JSONL = 'jsonl'
+
+
+def exportProjection(cash_flow, out, horizon_days, format=CSV,
+                     chunk_days=366, start=None, every_day=False):
+    # Writes the projection of cash_flow over horizon_days to out (a path
+    # or a text file) as CSV or JSON Lines. The horizon is projected
+    # chunk_days at a time, each chunk starting from the balance the
+    # previous one ended on, and out is flushed after every chunk, so
+    # memory use depends on chunk_days and not on horizon_days. Only days
+    # with transactions are written unless every_day is set. Returns the
+    # number of rows written.
+    if format not in (CSV, JSONL):
+        raise ValueError(f"unknown export format {format!r}")
+    if isinstance(out, str):
+        with open(out, 'w', newline='') as f:
+            return exportProjection(cash_flow, f, horizon_days, format,
+                                    chunk_days, start, every_day)
+    if start is None:
+        start = cash_flow.start_date
+    store = cash_flow.transaction_store
+    write = _csvWriter(out) if format == CSV else _jsonlWriter(out)
+    balance = cash_flow.start_balance
+    rows = 0
+    for offset in range(0, horizon_days, chunk_days):
+        length = min(chunk_days, horizon_days - offset)
+        first = start + timedelta(days=offset)
+        last = first + timedelta(days=length - 1)
+        projection = Projection(first, balance,
+                                store.getActiveTransactions(first, last),
+                                length)
+        for (d, day_balance, transactions) in _days(projection, every_day):
+            write(d, day_balance, transactions)
+            rows += 1
+        out.flush()
+        balance = projection.balanceOn(last)
+    return rows
+
+
+def _days(projection, every_day):
+    if not every_day:
+        yield from projection.transactionDays()
+        return
+    days = projection.transactionDays()
+    pending = next(days, None)
+    for index in range(len(projection)):
+        d = projection.start_date + timedelta(days=index)
+        if pending is not None and pending[0] == d:
+            yield pending
+            pending = next(days, None)
+        else:
+            yield (d, projection.balanceOn(d), [])
+
+
+def _csvWriter(out):
+    writer = csv.writer(out)
+    writer.writerow(['date', 'balance', 'transactions'])
+
+    def write(d, balance, transactions):
+        writer.writerow([d.isoformat(), str(balance),
+                         '; '.join(f"{t.description} {t.amount}"
+                                   for t in transactions)])
+    return write
+
+
+def _jsonlWriter(out):
+    def write(d, balance, transactions):
+        out.write(json.dumps({
+            'date': d.isoformat(),
+            'balance': str(balance),
+            'transactions': [{'description': t.description,
+                              'amount': str(t.amount)}
+                             for t in transactions]}))
+        out.write('\n')
+    return write
@@ -1,62 +1,153 @@
 #!/bin/env python
 
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation, ROUND_HALF_EVEN
+
+
+CENT = Decimal('0.01')
 
 
 class Money():
+    # A whole number of cents. ints, Decimals and strings are converted
+    # exactly; floats go through Decimal(float) as they always have, so
+    # Money(1.54) is still 1.54.
+    __slots__ = ('_cents',)
+
     def __init__(self, value=None):
         if not value:
-            value = 0.0
-        if type(value) is Money:
-            value = value.value
+            self._cents = 0
+        elif type(value) is Money:
+            self._cents = value._cents
+        elif type(value) is int:
+            self._cents = value * 100
+        elif isinstance(value, Decimal):
+            self._cents = _decimalCents(value)
+        elif type(value) is str:
+            try:
+                self._cents = _decimalCents(Decimal(value))
+            except InvalidOperation:
+                raise ValueError(f"could not convert string to Money: "
+                                 f"{value!r}")
         else:
-            value = float(value)
-        self.value = Decimal(value).quantize(Decimal('1.00'))
+            self._cents = _floatCents(float(value))
+
+    @classmethod
+    def fromCents(cls, cents):
+        return _fromCents(int(cents))
+
+    @property
+    def cents(self):
+        return self._cents
+
+    @property
+    def value(self):
+        return Decimal(self._cents).scaleb(-2)
+
+    # Pickle and YAML keep the historical {value: Decimal} state.
+    def __getstate__(self):
+        return {'value': self.value}
+
+    def __setstate__(self, state):
+        self._cents = _decimalCents(Decimal(state['value']))
 
     def __repr__(self):
-        return '{}'.format(self.value)
+        sign = '-' if self._cents < 0 else ''
+        (whole, part) = divmod(abs(self._cents), 100)
+        return f'{sign}{whole}.{part:02d}'
 
     def __str__(self):
-        return '{}'.format(self.value)
+        return self.__repr__()
+
+    def __hash__(self):
+        # Equal to the hash of the int or Decimal it compares equal to.
+        # A float only hashes the same when it is exactly a whole number
+        # of cents (1.25, not 1.54), even though floats compare equal
+        # whenever they round to the same cents.
+        if self._cents % 100 == 0:
+            return hash(self._cents // 100)
+        return hash(self.value)
 
     def __add__(self, other):
-        if type(other) is not Money:
-            other = Money(other)
-        value = self.value + other.value
-        return Money(value)
+        return _fromCents(self._cents + _centsOf(other))
+
+    def __radd__(self, other):
+        return _fromCents(_centsOf(other) + self._cents)
 
     def __sub__(self, other):
-        if type(other) is not Money:
-            other = Money(other)
-        value = self.value - other.value
-        return Money(value)
+        return _fromCents(self._cents - _centsOf(other))
+
+    def __rsub__(self, other):
+        return _fromCents(_centsOf(other) - self._cents)
+
+    def __neg__(self):
+        return _fromCents(-self._cents)
+
+    def __mul__(self, factor):
+        if type(factor) is int:
+            return _fromCents(self._cents * factor)
+        return _fromCents(_decimalCents(self.value * _decimal(factor)))
+
+    def __rmul__(self, factor):
+        return self.__mul__(factor)
+
+    def __truediv__(self, divisor):
+        if type(divisor) is Money:
+            return Decimal(self._cents) / Decimal(divisor._cents)
+        return _fromCents(_decimalCents(self.value / _decimal(divisor)))
 
     def __eq__(self, other):
-        if type(other) is not Money:
-            other = Money(other)
-        return self.value == other.value
+        return self._cents == _centsOf(other)
 
     def __ne__(self, other):
-        if type(other) is not Money:
-            other = Money(other)
-        return self.value != other.value
+        return self._cents != _centsOf(other)
 
     def __lt__(self, other):
-        if type(other) is not Money:
-            other = Money(other)
-        return self.value < other.value
+        return self._cents < _centsOf(other)
 
     def __le__(self, other):
-        if type(other) is not Money:
-            other = Money(other)
-        return self.value <= other.value
+        return self._cents <= _centsOf(other)
 
     def __gt__(self, other):
-        if type(other) is not Money:
-            other = Money(other)
-        return self.value > other.value
+        return self._cents > _centsOf(other)
 
     def __ge__(self, other):
-        if type(other) is not Money:
-            other = Money(other)
-        return self.value >= other.value
+        return self._cents >= _centsOf(other)
+
+
+def _fromCents(cents):
+    money = object.__new__(Money)
+    money._cents = cents
+    return money
+
+
+def _centsOf(other):
+    if type(other) is Money:
+        return other._cents
+    if type(other) is int:
+        return other * 100
+    if type(other) is float:
+        return _floatCents(other)
+    return Money(other)._cents
+
+
+def _floatCents(value):
+    # value * 100 is only off by rounding error, so unless it lands right
+    # next to a half cent, rounding it gives the same answer as the exact
+    # Decimal(value).quantize() below, without building any Decimals.
+    if abs(value) < 1e12:
+        scaled = value * 100
+        cents = round(scaled)
+        if abs(scaled - cents) < 0.499:
+            return cents
+    return _decimalCents(Decimal(value))
+
+
+def _decimal(number):
+    if isinstance(number, Decimal):
+        return number
+    if type(number) is float:
+        return Decimal(number)
+    return Decimal(str(number))
+
+
+def _decimalCents(value):
+    return int(value.quantize(CENT, rounding=ROUND_HALF_EVEN).scaleb(2))
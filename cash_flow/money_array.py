@@ -0,0 +1,100 @@
+#!/bin/env python
+
+import numpy as np
+from cash_flow.money import Money
+
+
+class MoneyArray(object):
+    # A column of amounts held as an int64 array of cents. Arithmetic and
+    # comparisons work on the whole column at once; indexing a single
+    # element gives back a Money.
+    def __init__(self, values=None):
+        if values is None:
+            values = []
+        self.cents = np.fromiter((_centsOf(v) for v in values),
+                                 dtype=np.int64)
+
+    @classmethod
+    def fromCents(cls, cents):
+        # Wraps an existing int64 array without copying it
+        array = cls.__new__(cls)
+        array.cents = np.asarray(cents, dtype=np.int64)
+        return array
+
+    def toList(self):
+        return [Money.fromCents(c) for c in self.cents.tolist()]
+
+    def __repr__(self):
+        return 'MoneyArray([{}])'.format(
+            ', '.join(str(m) for m in self.toList()))
+
+    def __len__(self):
+        return len(self.cents)
+
+    def __iter__(self):
+        return iter(self.toList())
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return Money.fromCents(self.cents[key])
+        return MoneyArray.fromCents(self.cents[key])
+
+    def __add__(self, other):
+        return MoneyArray.fromCents(self.cents + _operand(other))
+
+    def __radd__(self, other):
+        return MoneyArray.fromCents(_operand(other) + self.cents)
+
+    def __sub__(self, other):
+        return MoneyArray.fromCents(self.cents - _operand(other))
+
+    def __rsub__(self, other):
+        return MoneyArray.fromCents(_operand(other) - self.cents)
+
+    def __neg__(self):
+        return MoneyArray.fromCents(-self.cents)
+
+    # Comparisons give a boolean ndarray, like NumPy
+    __hash__ = None
+
+    def __eq__(self, other):
+        return self.cents == _operand(other)
+
+    def __ne__(self, other):
+        return self.cents != _operand(other)
+
+    def __lt__(self, other):
+        return self.cents < _operand(other)
+
+    def __le__(self, other):
+        return self.cents <= _operand(other)
+
+    def __gt__(self, other):
+        return self.cents > _operand(other)
+
+    def __ge__(self, other):
+        return self.cents >= _operand(other)
+
+    def cumsum(self):
+        return MoneyArray.fromCents(np.cumsum(self.cents))
+
+    def sum(self):
+        return Money.fromCents(self.cents.sum())
+
+    def min(self):
+        return Money.fromCents(self.cents.min())
+
+    def max(self):
+        return Money.fromCents(self.cents.max())
+
+
+def _operand(other):
+    if isinstance(other, MoneyArray):
+        return other.cents
+    return _centsOf(other)
+
+
+def _centsOf(value):
+    if type(value) is not Money:
+        value = Money(value)
+    return value.cents
@@ -0,0 +1,95 @@
+#!/bin/env python
+
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from cash_flow.money import Money
+
+
+class MonteCarloResult(object):
+    # Summary of many simulated runs of a projection, one column per day:
+    #   days             datetime64[D] dates covered
+    #   percentiles      {p: int64 cents}, the p-th percentile balance of
+    #                    each day across trials (nearest rank)
+    #   below_warning    chance the day ends below the warning balance
+    #   below_zero       chance the day ends below zero
+    #   ever_below_warning / ever_below_zero
+    #                    chance a trial dips below at any point
+    def __init__(self, days, percentiles, below_warning, below_zero,
+                 ever_below_warning, ever_below_zero, trials):
+        self.days = days
+        self.percentiles = percentiles
+        self.below_warning = below_warning
+        self.below_zero = below_zero
+        self.ever_below_warning = ever_below_warning
+        self.ever_below_zero = ever_below_zero
+        self.trials = trials
+
+
+def monteCarlo(projection, trials=10000, warning=100.00, seed=None,
+               workers=None, batch_size=500,
+               percentiles=(5, 25, 50, 75, 95)):
+    # Re-runs projection trials times, drawing every occurrence's amount
+    # from a normal distribution around its amount (t.amount_stddev) and
+    # moving its date by up to t.date_jitter days either way. Trials are
+    # split into batches, each with its own child of the seed, so results
+    # depend only on seed and batch_size, not on how many workers ran them.
+    payload = _payload(projection)
+    sizes = [min(batch_size, trials - first)
+             for first in range(0, trials, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if workers == 1:
+        batches = list(map(_runTrials, repeat(payload), seeds, sizes))
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            batches = list(pool.map(_runTrials, repeat(payload), seeds,
+                                    sizes))
+    balances = np.vstack(batches)
+
+    warning = Money(warning).cents
+    ranked = np.sort(balances, axis=0)
+    result = {p: ranked[int(round(p / 100 * (trials - 1)))]
+              for p in percentiles}
+    lowest = balances.min(axis=1)
+    return MonteCarloResult(projection.days, result,
+                            (balances < warning).mean(axis=0),
+                            (balances < 0).mean(axis=0),
+                            float((lowest < warning).mean()),
+                            float((lowest < 0).mean()),
+                            trials)
+
+
+def _payload(projection):
+    # Just the arrays a worker needs, so little has to be pickled
+    occurrences = projection.occurrences
+    transactions = projection.transactions
+    trans_index = occurrences['transaction']
+    stddev = np.array([t.amount_stddev.cents for t in transactions],
+                      dtype=np.int64)
+    jitter = np.array([t.date_jitter for t in transactions],
+                      dtype=np.int64)
+    return (occurrences['day'].astype(np.int64),
+            occurrences['amount'].astype(np.int64),
+            stddev[trans_index],
+            jitter[trans_index],
+            projection.start_balance.cents,
+            len(projection))
+
+
+def _runTrials(payload, seed, trials):
+    # (trials x days) end-of-day balances in cents for one batch.
+    # Occurrences moved before the start count on the first day; those
+    # moved past the end are dropped.
+    (days, cents, stddev, jitter, start_cents, horizon_days) = payload
+    rng = np.random.default_rng(seed)
+    shape = (trials, len(days))
+    amounts = cents + np.rint(rng.standard_normal(shape) *
+                              stddev).astype(np.int64)
+    moved = np.maximum(days + rng.integers(-jitter, jitter, size=shape,
+                                           endpoint=True), 0)
+    inside = moved < horizon_days
+    slots = (np.arange(trials)[:, np.newaxis] * horizon_days + moved)[inside]
+    deltas = np.zeros(trials * horizon_days, dtype=np.int64)
+    np.add.at(deltas, slots, amounts[inside])
+    return start_cents + np.cumsum(
+        deltas.reshape(trials, horizon_days), axis=1)
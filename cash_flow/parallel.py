@@ -0,0 +1,64 @@
+#!/bin/env python
+
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from itertools import repeat
+from cash_flow.money import Money
+from cash_flow.transaction import Transaction
+from cash_flow.projection import occurrenceDays
+
+
+def projectBalances(store, start_date, start_balance, horizon_days=365,
+                    workers=None, shard_size=1000):
+    # End-of-day balances in cents over the horizon, the same numbers
+    # Projection.balances holds. Active transactions are packed into
+    # plain tuples, shard_size to a shard, and each worker turns a shard
+    # into a per-day delta series. Integer sums don't depend on order, so
+    # summing the shards and taking the prefix sum matches the serial
+    # projection exactly.
+    last = start_date + timedelta(days=horizon_days - 1)
+    rows = [_pack(t) for t in store.getActiveTransactions(start_date, last)
+            if t.amount.cents]
+    shards = [rows[first:first + shard_size]
+              for first in range(0, len(rows), shard_size)]
+    deltas = np.zeros(horizon_days, dtype=np.int64)
+    if workers == 1 or len(shards) < 2:
+        parts = map(_shardDeltas, repeat(start_date.toordinal()),
+                    repeat(horizon_days), shards)
+        for part in parts:
+            deltas += part
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            for part in pool.map(_shardDeltas,
+                                 repeat(start_date.toordinal()),
+                                 repeat(horizon_days), shards):
+                deltas += part
+    return Money(start_balance).cents + np.cumsum(deltas)
+
+
+def _pack(t):
+    # Everything occurrenceDays looks at, as ordinals and cents
+    return (t.start.toordinal(),
+            t.end.toordinal() if t.end else None,
+            t.frequency,
+            t.amount.cents,
+            tuple(sorted(d.toordinal() for d in t.skip)))
+
+
+def _unpack(row):
+    (start, end, frequency, cents, skip) = row
+    return Transaction(start=date.fromordinal(start),
+                       end=date.fromordinal(end) if end else None,
+                       amount=Money.fromCents(cents),
+                       frequency=frequency,
+                       skip=set(date.fromordinal(d) for d in skip))
+
+
+def _shardDeltas(start_ordinal, horizon_days, rows):
+    start_date = date.fromordinal(start_ordinal)
+    deltas = np.zeros(horizon_days, dtype=np.int64)
+    for row in rows:
+        days = occurrenceDays(_unpack(row), start_date, horizon_days)
+        deltas[days] += row[3]
+    return deltas
@@ -0,0 +1,300 @@
+#!/bin/env python
+
+import numpy as np
+from datetime import timedelta
+from cash_flow.transaction import Transaction
+from cash_flow.money import Money
+from cash_flow.range_minimum import RangeMinimum
+
+
+OCCURRENCE_DTYPE = np.dtype([('day', np.int32),
+                             ('transaction', np.int32),
+                             ('amount', np.int64)])
+
+
+class Projection(object):
+    # Whole-horizon projection held as arrays. All money is integer cents:
+    #   days         datetime64[D] day axis
+    #   deltas       net change per day
+    #   balances     running balance at the end of each day
+    #   occurrences  (day, transaction, amount) rows sorted by day, where
+    #                transaction indexes self.transactions
+    # A projection is a sum of per-transaction contributions, so it can be
+    # kept up to date one transaction at a time; see updateTransaction and
+    # sync.
+    def __init__(self, start_date, start_balance, transactions,
+                 horizon_days):
+        self.start_date = start_date
+        self.start_balance = Money(start_balance)
+        self.horizon_days = horizon_days
+        # Store version this projection reflects, when built from a store
+        self.version = None
+        self.read_only = False
+        first = np.datetime64(start_date, 'D')
+        self.days = np.arange(first, first + horizon_days)
+        self._build(transactions)
+
+    def __len__(self):
+        return self.horizon_days
+
+    @property
+    def transactions(self):
+        if self._table is None:
+            self._buildTable()
+        return self._table[0]
+
+    @property
+    def occurrences(self):
+        if self._table is None:
+            self._buildTable()
+        return self._table[1]
+
+    @property
+    def nbytes(self):
+        # Approximate memory held by the projection's arrays
+        total = (self.days.nbytes + self.deltas.nbytes +
+                 self.balances.nbytes)
+        total += sum(days.nbytes for (_, days, _)
+                     in self._contributions.values())
+        if self._table is not None:
+            total += self._table[1].nbytes
+        return total
+
+    def freeze(self):
+        # Make the projection safe to share: the occurrence table is built
+        # now rather than on first use, every array it hands out or keeps
+        # becomes read-only and the methods that change it raise ValueError
+        if self._table is None:
+            self._buildTable()
+        arrays = [self.days, self.deltas, self.balances, self._table[1]]
+        arrays.extend(days for (_, days, _) in self._contributions.values())
+        for array in arrays:
+            array.flags.writeable = False
+        self.read_only = True
+
+    def dayIndex(self, d):
+        index = (d - self.start_date).days
+        if index < 0 or index >= self.horizon_days:
+            raise IndexError(f"{d} is outside the projection")
+        return index
+
+    def balanceOn(self, d):
+        return Money.fromCents(self.balances[self.dayIndex(d)])
+
+    def transactionsOn(self, d):
+        index = self.dayIndex(d)
+        days = self.occurrences['day']
+        lo = np.searchsorted(days, index, side='left')
+        hi = np.searchsorted(days, index, side='right')
+        return [self.transactions[i]
+                for i in self.occurrences['transaction'][lo:hi]]
+
+    def lowestBalance(self, first=None, last=None):
+        # (date, balance) of the lowest end-of-day balance between first
+        # and last inclusive, the earliest such day on ties
+        lo = 0 if first is None else self.dayIndex(first)
+        hi = self.horizon_days - 1 if last is None else self.dayIndex(last)
+        if self._range_minimum is None:
+            self._range_minimum = RangeMinimum(self.balances)
+        (cents, index) = self._range_minimum.query(lo, hi)
+        return (self.start_date + timedelta(days=index),
+                Money.fromCents(cents))
+
+    def minimumStartBalance(self, warning):
+        # Smallest starting balance that keeps every end-of-day balance at
+        # or above warning. Balances move one for one with the starting
+        # balance, so it's warning less the lowest running net change.
+        (_, low) = self.lowestBalance()
+        return Money(warning) - (low - self.start_balance)
+
+    def minimumDeposit(self, d, warning):
+        # Smallest one-off deposit on d that keeps every end-of-day balance
+        # at or above warning, or None if the balance drops below it
+        # before d
+        index = self.dayIndex(d)
+        if index > 0:
+            (_, before) = self.lowestBalance(last=d - timedelta(days=1))
+            if before < warning:
+                return None
+        (_, low) = self.lowestBalance(first=d)
+        return max(Money(0), Money(warning) - low)
+
+    def transactionDays(self):
+        # Same (date, balance, transactions) tuples as
+        # CashFlow.getTransactionDays, for the days that have any
+        occurrences = self.occurrences
+        transactions = self.transactions
+        days = occurrences['day']
+        bounds = np.flatnonzero(np.diff(days)) + 1
+        for (lo, hi) in zip(np.r_[0, bounds], np.r_[bounds, len(days)]):
+            if lo == hi:
+                continue
+            day = int(days[lo])
+            yield (self.start_date + timedelta(days=day),
+                   Money.fromCents(self.balances[day]),
+                   [transactions[i]
+                    for i in occurrences['transaction'][lo:hi]])
+
+    def setStartBalance(self, start_balance):
+        self._checkWritable()
+        start_balance = Money(start_balance)
+        # A uniform shift leaves every range minimum where it was
+        self.balances += start_balance.cents - self.start_balance.cents
+        self.start_balance = start_balance
+
+    def updateTransaction(self, t):
+        # Add t, or bring the projection's view of it up to date: take off
+        # its old contribution, add the new one and re-accumulate balances
+        # from the earliest day either of them touched.
+        self._checkWritable()
+        self._refresh(self._apply(t.id, t))
+
+    def removeTransaction(self, t):
+        self._checkWritable()
+        self._refresh(self._apply(t.id, None))
+
+    def sync(self, store):
+        # Catch up with changes made to store since self.version, falling
+        # back to a rebuild when its journal doesn't reach back that far.
+        self._checkWritable()
+        changes = None
+        if self.version is not None:
+            changes = store.changesSince(self.version)
+        if changes is None:
+            last = self.start_date + timedelta(days=self.horizon_days - 1)
+            self._build(store.getActiveTransactions(self.start_date, last))
+        else:
+            first = None
+            for transaction_id in dict.fromkeys(c.transaction_id
+                                                for c in changes):
+                first = _earliest(first, self._apply(
+                    transaction_id, store.getTransactionById(transaction_id)))
+            self._refresh(first)
+        self.version = store.version
+
+    def _checkWritable(self):
+        if self.read_only:
+            raise ValueError("projection is read-only")
+
+    def _build(self, transactions):
+        # id -> (transaction, day offsets, cents) for every transaction
+        # with a non-zero occurrence in the horizon, in order
+        self._contributions = {}
+        self._table = None
+        self.deltas = np.zeros(self.horizon_days, dtype=np.int64)
+        for t in transactions:
+            self._apply(t.id, t)
+        self.balances = self.start_balance.cents + np.cumsum(self.deltas)
+        self._range_minimum = None
+
+    def _apply(self, transaction_id, t):
+        # Returns the first day offset whose delta changed, if any
+        first = None
+        old = self._contributions.get(transaction_id)
+        if old is not None:
+            (_, days, cents) = old
+            self.deltas[days] -= cents
+            first = days[0]
+        days = []
+        cents = 0
+        if t is not None:
+            days = occurrenceDays(t, self.start_date, self.horizon_days)
+            cents = t.amount.cents
+        if len(days) and cents:
+            self.deltas[days] += cents
+            self._contributions[transaction_id] = (t, days, cents)
+            first = _earliest(first, days[0])
+        elif old is not None:
+            del self._contributions[transaction_id]
+        self._table = None
+        return first
+
+    def _refresh(self, first):
+        if first is None:
+            return
+        first = int(first)
+        base = (self.balances[first - 1] if first > 0
+                else self.start_balance.cents)
+        self.balances[first:] = base + np.cumsum(self.deltas[first:])
+        if self._range_minimum is not None:
+            self._range_minimum.update(first)
+
+    def _buildTable(self):
+        transactions = []
+        parts = []
+        for (index, (t, days, cents)) in enumerate(
+                self._contributions.values()):
+            transactions.append(t)
+            part = np.zeros(len(days), dtype=OCCURRENCE_DTYPE)
+            part['day'] = days
+            part['transaction'] = index
+            part['amount'] = cents
+            parts.append(part)
+        if parts:
+            occurrences = np.concatenate(parts)
+            order = np.lexsort((occurrences['transaction'],
+                                occurrences['day']))
+            occurrences = occurrences[order]
+        else:
+            occurrences = np.zeros(0, dtype=OCCURRENCE_DTYPE)
+        self._table = (transactions, occurrences)
+
+
+def occurrenceDays(trans, start_date, horizon_days):
+    # Day offsets from start_date of every occurrence of trans within the
+    # horizon, ascending. Recurring schedules are laid out with arange;
+    # one-off transactions (and the odd end-before-skips case) walk
+    # occurrencesBetween.
+    last_date = start_date + timedelta(days=horizon_days - 1)
+    if trans._is_recurring() and not (trans.end and trans.skip):
+        if trans.frequency in Transaction.PERIOD_DAYS:
+            first = trans._first_date_on_or_after(start_date)
+            days = np.arange((first - start_date).days, horizon_days,
+                             Transaction.PERIOD_DAYS[trans.frequency])
+        else:
+            days = _month_days(trans, start_date, last_date)
+        if trans.end:
+            end = (trans.end - start_date).days
+            days = days[(days <= end) |
+                        (days == (trans.start - start_date).days)]
+        if trans.skip:
+            skip = [(d - start_date).days for d in trans.skip]
+            days = days[~np.isin(days, skip)]
+        return days
+    return np.array([(d - start_date).days for (d, amt)
+                     in trans.occurrencesBetween(start_date, last_date)],
+                    dtype=np.int64)
+
+
+def _month_days(trans, start_date, last_date):
+    # Day offsets of a month-period schedule between start_date and
+    # last_date. The step counts come from arange; the day of month only
+    # changes over the first four years (see _day_after_steps), so that is
+    # looked up from a short table.
+    months = Transaction.PERIOD_MONTHS[trans.frequency]
+    start = trans.start
+    first_step = max(0, ((start_date.year - start.year) * 12 +
+                         start_date.month - start.month) // months)
+    last_step = ((last_date.year - start.year) * 12 +
+                 last_date.month - start.month) // months
+    steps = np.arange(first_step, last_step + 1)
+    month_index = (start.year * 12 + start.month - 1 - 1970 * 12 +
+                   steps * months)
+    dates = month_index.astype('datetime64[M]').astype('datetime64[D]')
+    if start.day <= 28:
+        dates = dates + (start.day - 1)
+    else:
+        cycle = np.array([trans._day_after_steps(step)
+                          for step in range(48 // months + 1)])
+        dates = dates + (cycle[np.minimum(steps, len(cycle) - 1)] - 1)
+    days = (dates - np.datetime64(start_date, 'D')).astype(np.int64)
+    return days[(days >= 0) &
+                (days <= (last_date - start_date).days)]
+
+
+def _earliest(first, other):
+    if first is None:
+        return other
+    if other is None:
+        return first
+    return min(first, other)
@@ -0,0 +1,79 @@
+#!/bin/env python
+
+import weakref
+from collections import OrderedDict
+from cash_flow.money import Money
+
+
+class ProjectionCache(object):
+    # Least-recently-used cache of projections, keyed by (store, store
+    # version, start date, start balance, horizon). Cached projections
+    # are frozen and handed out as they are, so a hit copies nothing;
+    # callers that want to change one should build their own. Entries
+    # for a store are dropped as soon as it changes. The total nbytes of
+    # cached projections is kept within max_bytes.
+    MAX_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # id(store) -> the finalizer that forgets it once it's collected
+        self._stores = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def project(self, cash_flow, start=None, horizon_days=365):
+        if start is None:
+            start = cash_flow.start_date
+        store = cash_flow.transaction_store
+        key = (id(store), store.version, start,
+               Money(cash_flow.start_balance).cents, horizon_days)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        projection = cash_flow.project(start, horizon_days)
+        projection.freeze()
+        size = projection.nbytes
+        if size <= self.max_bytes:
+            self._watch(store)
+            self.entries[key] = (projection, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                self._evict(next(iter(self.entries)))
+                self.evictions += 1
+        return projection
+
+    def clear(self):
+        for key in list(self.entries):
+            self._evict(key)
+
+    def _watch(self, store):
+        if id(store) in self._stores:
+            return
+        store.subscribe(self._storeChanged)
+        self._stores[id(store)] = weakref.finalize(
+            store, self._release, id(store))
+
+    def _storeChanged(self, store, change):
+        self._forget(id(store))
+
+    def _release(self, store_id):
+        # The store has been garbage collected; its id may be reused
+        self._forget(store_id)
+        del self._stores[store_id]
+
+    def _forget(self, store_id):
+        for key in [key for key in self.entries if key[0] == store_id]:
+            self._evict(key)
+
+    def _evict(self, key):
+        (_, size) = self.entries.pop(key)
+        self.nbytes -= size
@@ -0,0 +1,42 @@
+#!/bin/env python
+
+import numpy as np
+
+
+class RangeMinimum(object):
+    # Sparse table over an array: level j holds, for every i, the index of
+    # the smallest value in values[i:i + 2**j] (leftmost on ties). Any
+    # window is covered by two overlapping power-of-two blocks, so queries
+    # are O(1). values is referenced, not copied; after changing
+    # values[first:] in place, call update(first).
+    def __init__(self, values):
+        self.values = values
+        self.levels = [np.arange(len(values))]
+        width = 2
+        while width <= len(values):
+            self.levels.append(np.zeros(len(values) - width + 1,
+                                        dtype=np.int64))
+            width *= 2
+        self.update(0)
+
+    def update(self, first=0):
+        # Only blocks reaching index first or later need recomputing
+        for j in range(1, len(self.levels)):
+            half = 1 << (j - 1)
+            start = max(0, first - (1 << j) + 1)
+            previous = self.levels[j - 1]
+            level = self.levels[j]
+            left = previous[start:len(level)]
+            right = previous[start + half:len(level) + half]
+            level[start:] = np.where(self.values[right] < self.values[left],
+                                     right, left)
+
+    def query(self, lo, hi):
+        # (smallest value, its index) over values[lo:hi + 1]
+        if lo < 0 or hi >= len(self.values) or lo > hi:
+            raise IndexError(f"bad range {lo}..{hi}")
+        j = (hi - lo + 1).bit_length() - 1
+        a = self.levels[j][lo]
+        b = self.levels[j][hi - (1 << j) + 1]
+        index = int(b if self.values[b] < self.values[a] else a)
+        return (self.values[index], index)
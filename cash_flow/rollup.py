@@ -0,0 +1,87 @@
+#!/bin/env python
+
+import numpy as np
+from cash_flow.money import Money
+
+
+WEEK = 'week'
+MONTH = 'month'
+QUARTER = 'quarter'
+YEAR = 'year'
+PERIODS = (WEEK, MONTH, QUARTER, YEAR)
+
+
+class Rollup(object):
+    # Per-period totals of a projection, one entry per period, all in
+    # integer cents:
+    #   starts    datetime64[D] first day of each period (clipped to the
+    #             projection)
+    #   inflow    sum of positive occurrences
+    #   outflow   sum of negative occurrences (negative or zero)
+    #   net       inflow + outflow
+    #   ending    balance at the end of the period's last day
+    #   minimum   lowest end-of-day balance within the period
+    def __init__(self, starts, inflow, outflow, net, ending, minimum):
+        self.starts = starts
+        self.inflow = inflow
+        self.outflow = outflow
+        self.net = net
+        self.ending = ending
+        self.minimum = minimum
+
+    def __len__(self):
+        return len(self.starts)
+
+    def rows(self):
+        # (start date, inflow, outflow, net, ending, minimum) with Money
+        # amounts, for display
+        columns = [c.tolist() for c in (self.inflow, self.outflow, self.net,
+                                        self.ending, self.minimum)]
+        for (index, start) in enumerate(self.starts.tolist()):
+            yield (start,) + tuple(Money.fromCents(c[index])
+                                   for c in columns)
+
+
+def rollup(projection, period=MONTH):
+    # Summarise projection by period: one of PERIODS, or a list of dates
+    # that start custom buckets (days before the first of them fall in a
+    # leading bucket). Each column is a single segment reduction over the
+    # daily arrays.
+    bounds = _periodStarts(projection.days, period)
+    occurrences = projection.occurrences
+    bucket = np.searchsorted(bounds, occurrences['day'], side='right') - 1
+    amounts = occurrences['amount']
+    inflow = np.zeros(len(bounds), dtype=np.int64)
+    outflow = np.zeros(len(bounds), dtype=np.int64)
+    np.add.at(inflow, bucket, np.maximum(amounts, 0))
+    np.add.at(outflow, bucket, np.minimum(amounts, 0))
+    if not len(bounds):
+        empty = np.zeros(0, dtype=np.int64)
+        return Rollup(projection.days[:0], inflow, outflow, empty, empty,
+                      empty)
+    ends = np.r_[bounds[1:], len(projection)] - 1
+    return Rollup(projection.days[bounds], inflow, outflow,
+                  np.add.reduceat(projection.deltas, bounds),
+                  projection.balances[ends],
+                  np.minimum.reduceat(projection.balances, bounds))
+
+
+def _periodStarts(days, period):
+    # Indexes into days where each bucket begins
+    if not len(days):
+        return np.zeros(0, dtype=np.int64)
+    if period == WEEK:
+        # Weeks start on Monday; 1970-01-01 was a Thursday
+        keys = (days.astype(np.int64) + 3) // 7
+    elif period == MONTH:
+        keys = days.astype('datetime64[M]').astype(np.int64)
+    elif period == QUARTER:
+        keys = days.astype('datetime64[M]').astype(np.int64) // 3
+    elif period == YEAR:
+        keys = days.astype('datetime64[Y]').astype(np.int64)
+    elif isinstance(period, str):
+        raise ValueError(f"unknown period {period!r}")
+    else:
+        starts = np.array(sorted(period), dtype='datetime64[D]')
+        keys = np.searchsorted(starts, days, side='right')
+    return np.r_[0, np.flatnonzero(np.diff(keys)) + 1]
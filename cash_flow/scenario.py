@@ -0,0 +1,82 @@
+#!/bin/env python
+
+import numpy as np
+from cash_flow.money import Money
+
+
+class Scenario(object):
+    # A what-if on top of a base projection. Transactions may be given as
+    # Transaction objects or ids.
+    #   start_balance  replaces the projection's starting balance
+    #   scales         {transaction: factor} applied to its amount
+    #   include        if given, only these transactions count
+    #   exclude        these transactions don't count
+    #   skip           {transaction: dates} extra dates to skip
+    def __init__(self,
+                 name="",
+                 start_balance=None,
+                 scales=None,
+                 include=None,
+                 exclude=None,
+                 skip=None):
+        self.name = name
+        self.start_balance = start_balance
+        self.scales = {_id(t): factor
+                       for (t, factor) in (scales or {}).items()}
+        self.include = None
+        if include is not None:
+            self.include = set(_id(t) for t in include)
+        self.exclude = set(_id(t) for t in (exclude or []))
+        self.skip = {_id(t): set(dates)
+                     for (t, dates) in (skip or {}).items()}
+
+
+def evaluateScenarios(projection, scenarios):
+    # End-of-day balances in cents, one row per scenario and one column per
+    # day of the projection. Every scenario reuses the projection's
+    # occurrence table; only the per-transaction amounts and a mask over
+    # occurrences differ between rows.
+    transactions = projection.transactions
+    occurrences = projection.occurrences
+    positions = {t.id: index for (index, t) in enumerate(transactions)}
+    base_cents = np.array([t.amount.cents for t in transactions],
+                          dtype=np.int64)
+    trans_index = occurrences['transaction']
+    days = occurrences['day']
+
+    amounts = np.zeros((len(scenarios), len(occurrences)), dtype=np.int64)
+    start_balances = np.zeros(len(scenarios), dtype=np.int64)
+    for (row, scenario) in enumerate(scenarios):
+        cents = base_cents.copy()
+        for (transaction_id, factor) in scenario.scales.items():
+            if transaction_id in positions:
+                index = positions[transaction_id]
+                cents[index] = (Money.fromCents(cents[index]) * factor).cents
+        if scenario.include is not None:
+            cents[[index for (transaction_id, index) in positions.items()
+                   if transaction_id not in scenario.include]] = 0
+        cents[[positions[transaction_id]
+               for transaction_id in scenario.exclude
+               if transaction_id in positions]] = 0
+        amounts[row] = cents[trans_index]
+        for (transaction_id, dates) in scenario.skip.items():
+            if transaction_id not in positions:
+                continue
+            skipped = [(d - projection.start_date).days for d in dates]
+            amounts[row, (trans_index == positions[transaction_id]) &
+                    np.isin(days, skipped)] = 0
+        balance = scenario.start_balance
+        if balance is None:
+            balance = projection.start_balance
+        start_balances[row] = Money(balance).cents
+
+    # Occurrences are sorted by day, so each day's total is one segment sum
+    deltas = np.zeros((len(scenarios), len(projection)), dtype=np.int64)
+    if len(occurrences):
+        bounds = np.r_[0, np.flatnonzero(np.diff(days)) + 1]
+        deltas[:, days[bounds]] = np.add.reduceat(amounts, bounds, axis=1)
+    return start_balances[:, np.newaxis] + np.cumsum(deltas, axis=1)
+
+
+def _id(t):
+    return getattr(t, 'id', t)
@@ -0,0 +1,263 @@
+#!/bin/env python
+
+import json
+import sqlite3
+from datetime import date
+from cash_flow.money import Money
+from cash_flow.transaction import Transaction
+from cash_flow.transaction_store import (
+    ChangeJournal, readTransactions, writeTransactions)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    start TEXT NOT NULL,
+    original_start TEXT NOT NULL,
+    end TEXT,
+    description TEXT NOT NULL,
+    amount INTEGER NOT NULL,
+    frequency TEXT NOT NULL,
+    skip TEXT NOT NULL,
+    scheduled INTEGER NOT NULL,
+    cleared INTEGER NOT NULL,
+    amount_stddev INTEGER NOT NULL,
+    date_jitter INTEGER NOT NULL,
+    first_active TEXT NOT NULL,
+    last_active TEXT
+);
+CREATE INDEX IF NOT EXISTS transactions_description
+    ON transactions (description);
+CREATE INDEX IF NOT EXISTS transactions_frequency
+    ON transactions (frequency, start);
+CREATE INDEX IF NOT EXISTS transactions_active
+    ON transactions (first_active, last_active);
+"""
+
+COLUMNS = ('id', 'start', 'original_start', 'end', 'description', 'amount',
+           'frequency', 'skip', 'scheduled', 'cleared', 'amount_stddev',
+           'date_jitter', 'first_active', 'last_active')
+
+UPSERT = "INSERT INTO transactions ({}) VALUES ({}) " \
+         "ON CONFLICT (id) DO UPDATE SET {}".format(
+             ', '.join(COLUMNS), ', '.join('?' * len(COLUMNS)),
+             ', '.join(f"{c} = excluded.{c}" for c in COLUMNS[1:]))
+
+SELECT = "SELECT {} FROM transactions".format(', '.join(COLUMNS))
+
+
+class SQLiteTransactionStore(ChangeJournal):
+    # TransactionStore kept in an SQLite file. Only the rows a query asks
+    # for are read, and each is turned into a Transaction once: later
+    # queries hand back the same object, so edits made to it are seen by
+    # everyone. Adds and removes are written straight away, each call in
+    # one database transaction; edits to transactions are written, all
+    # together, by the next query or saveTransactions().
+    def __init__(self, path, journal_length=ChangeJournal.JOURNAL_LENGTH):
+        super().__init__(journal_length)
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.executescript(SCHEMA)
+        # id -> Transaction for every row read or written so far
+        self._loaded = {}
+        self._dirty = set()
+
+    def __len__(self):
+        return self._query("SELECT COUNT(*) FROM transactions").fetchone()[0]
+
+    def close(self):
+        self._flush()
+        self.db.close()
+
+    def addTransactions(self, first_transaction, *remaining_transactions):
+        self.addTransactionsFrom((first_transaction,) +
+                                 remaining_transactions)
+
+    def addTransactionsFrom(self, transactions):
+        transactions = list(transactions)
+        self._flush()
+        with self.db:
+            existing = set()
+            for t in transactions:
+                if self.db.execute("SELECT 1 FROM transactions WHERE id = ?",
+                                   (t.id,)).fetchone():
+                    existing.add(t.id)
+                self.db.execute(UPSERT, _row(t))
+        for t in transactions:
+            self._remember(t)
+            self._recordChange(ChangeJournal.MODIFIED if t.id in existing
+                               else ChangeJournal.ADDED, t.id)
+
+    def replaceTransaction(self, old, new):
+        self.removeTransactions(old)
+        self.addTransactions(new)
+
+    def removeTransactions(self, first_transaction, *remaining_transactions):
+        self.removeTransactionsFrom((first_transaction,) +
+                                    remaining_transactions)
+
+    def removeTransactionsFrom(self, transactions):
+        # Transactions that aren't in the store are ignored
+        self._removeIds([t.id for t in transactions])
+
+    def getTransactionById(self, transaction_id):
+        if transaction_id in self._loaded:
+            return self._loaded[transaction_id]
+        found = self._select("WHERE id = ?", (transaction_id,))
+        return found[0] if found else None
+
+    def hasTransaction(self, t):
+        return self.getTransactionById(t.id) is not None
+
+    def saveTransactions(self, file=None):
+        # Writes out edited transactions; only their rows are touched.
+        # Everything else is already on disk. Given a file, the contents
+        # are also saved to it as YAML, as TransactionStore would.
+        self._flush()
+        if file is None:
+            return
+        try:
+            writeTransactions(file, self.getTransactions())
+        except Exception:
+            print(f"Failed to save transactions to {file}.")
+
+    def loadTransactions(self, file):
+        # Replaces the contents with a YAML file saved by TransactionStore
+        try:
+            store = readTransactions(file)
+        except Exception:
+            print(f"Failed to load transaction store from {file}.")
+            return
+        self.replaceAll(store)
+
+    def replaceAll(self, transactions):
+        self._removeIds([row[0] for row in
+                         self._query("SELECT id FROM transactions")])
+        self.addTransactionsFrom(transactions)
+
+    def getTransaction(self, description, requested_date=None):
+        # Currently does not handle recurring/overridden transactions
+        if requested_date is None:
+            return self._select("WHERE description = ?", (description,))
+        candidates = self._select(
+            "WHERE description = ? AND first_active <= ? AND "
+            "(last_active IS NULL OR last_active >= ?)",
+            (description, requested_date.isoformat(),
+             requested_date.isoformat()))
+        return [t for t in candidates if t.amtOn(requested_date) != 0]
+
+    def getTransactions(self, frequency=None):
+        if frequency is None:
+            return self._select()
+        return self._select("WHERE frequency = ?", (frequency,))
+
+    def getActiveTransactions(self, first_date, last_date=None):
+        # Transactions that can pay out somewhere in [first_date, last_date]
+        if last_date is None:
+            last_date = first_date
+        return self._select(
+            "WHERE first_active <= ? AND "
+            "(last_active IS NULL OR last_active >= ?)",
+            (last_date.isoformat(), first_date.isoformat()))
+
+    def updateRecurringStartDates(self, new_date):
+        for t in self._select("WHERE frequency != ?", (Transaction.ONCE,)):
+            t.updateStartDate(new_date)
+        self._flush()
+
+    def purgeSingleBefore(self, purge_date):
+        self._removeIds([row[0] for row in self._query(
+            "SELECT id FROM transactions WHERE frequency = ? AND start < ?",
+            (Transaction.ONCE, purge_date.isoformat()))])
+
+    def _removeIds(self, ids):
+        self._flush()
+        removed = []
+        with self.db:
+            for transaction_id in ids:
+                if self.db.execute("DELETE FROM transactions WHERE id = ?",
+                                   (transaction_id,)).rowcount:
+                    removed.append(transaction_id)
+        for transaction_id in removed:
+            t = self._loaded.pop(transaction_id, None)
+            if t is not None:
+                t.removeObserver(self._transactionChanged)
+            self._recordChange(ChangeJournal.REMOVED, transaction_id)
+
+    def _select(self, where="", parameters=()):
+        # Matching transactions in the order they were added
+        return [self._transaction(row) for row in self._query(
+            f"{SELECT} {where} ORDER BY seq", parameters)]
+
+    def _query(self, sql, parameters=()):
+        # Edits must reach the table before it's searched
+        self._flush()
+        return self.db.execute(sql, parameters)
+
+    def _flush(self):
+        if not self._dirty:
+            return
+        with self.db:
+            self.db.executemany(
+                "UPDATE transactions SET {} WHERE id = ?".format(
+                    ', '.join(f"{c} = ?" for c in COLUMNS[1:])),
+                [_row(self._loaded[i])[1:] + (i,) for i in self._dirty])
+        self._dirty.clear()
+
+    def _remember(self, t):
+        old = self._loaded.get(t.id)
+        if old is t:
+            return
+        if old is not None:
+            old.removeObserver(self._transactionChanged)
+        self._loaded[t.id] = t
+        t.addObserver(self._transactionChanged)
+
+    def _transaction(self, row):
+        t = self._loaded.get(row[0])
+        if t is None:
+            t = _transaction(row)
+            self._remember(t)
+        return t
+
+    def _transactionChanged(self, t, field, old):
+        self._dirty.add(t.id)
+        self._recordChange(ChangeJournal.MODIFIED, t.id)
+
+
+def _row(t):
+    (first, last) = t.activeRange()
+    return (t.id,
+            t.start.isoformat(),
+            t.original_start.isoformat(),
+            t.end.isoformat() if t.end else None,
+            t.description,
+            Money(t.amount).cents,
+            t.frequency,
+            json.dumps(sorted(d.isoformat() for d in t.skip)),
+            int(bool(t.scheduled)),
+            int(bool(t.cleared)),
+            Money(t.amount_stddev).cents,
+            t.date_jitter,
+            first.isoformat(),
+            last.isoformat() if last else None)
+
+
+def _transaction(row):
+    (transaction_id, start, original_start, end, description, amount,
+     frequency, skip, scheduled, cleared, amount_stddev, date_jitter,
+     _, _) = row
+    return Transaction(
+        start=date.fromisoformat(start),
+        original_start=date.fromisoformat(original_start),
+        end=date.fromisoformat(end) if end else None,
+        description=description,
+        amount=Money.fromCents(amount),
+        frequency=frequency,
+        skip=set(date.fromisoformat(d) for d in json.loads(skip)),
+        scheduled=bool(scheduled),
+        cleared=bool(cleared),
+        amount_stddev=Money.fromCents(amount_stddev),
+        date_jitter=date_jitter,
+        id=transaction_id)
@@ -0,0 +1,30 @@
+#!/bin/env python
+
+import numpy as np
+from bisect import bisect_right
+from datetime import date, timedelta
+from cash_flow.money import Money
+
+
+def intervalsBelow(projection, *thresholds):
+    # For each threshold, the [enter, exit) date intervals where the
+    # projected end-of-day balance is below it. An interval still open at
+    # the end of the horizon exits the day after it. All thresholds are
+    # found in one pass over the balances by looking for sign changes.
+    cents = np.array([Money(t).cents for t in thresholds], dtype=np.int64)
+    below = np.zeros((len(cents), len(projection.balances) + 2),
+                     dtype=np.int8)
+    below[:, 1:-1] = projection.balances[np.newaxis, :] < cents[:, np.newaxis]
+    (rows, days) = np.nonzero(np.diff(below, axis=1))
+    intervals = [[] for t in thresholds]
+    start = projection.start_date
+    for i in range(0, len(rows), 2):
+        intervals[rows[i]].append((start + timedelta(days=int(days[i])),
+                                   start + timedelta(days=int(days[i + 1]))))
+    return intervals
+
+
+def inIntervals(intervals, d):
+    # Whether d falls in one of intervals, as returned by intervalsBelow
+    i = bisect_right(intervals, (d, date.max))
+    return i > 0 and intervals[i - 1][1] > d
@@ -1,5 +1,7 @@
 #!/bin/env python
 
+import uuid
+from calendar import monthrange
 from datetime import date, timedelta
 from dateutil.relativedelta import relativedelta
 from cash_flow.money import Money
@@ -13,6 +15,8 @@ class Transaction(object):
     QUARTERLY = "Q"
     ANNUALLY = "A"
     INTERVALS = [ONCE, WEEKLY, BIWEEKLY, MONTHLY, QUARTERLY, ANNUALLY]
+    PERIOD_DAYS = {WEEKLY: 7, BIWEEKLY: 14}
+    PERIOD_MONTHS = {MONTHLY: 1, QUARTERLY: 3, ANNUALLY: 12}
 
     def __init__(self,
                  start=date.today(),
@@ -23,7 +27,14 @@ class Transaction(object):
                  frequency=None,
                  skip=None,
                  scheduled=False,
-                 cleared=False):
+                 cleared=False,
+                 amount_stddev=0.00,
+                 date_jitter=0,
+                 id=None):
+        self._observers = []
+        if id is None:
+            id = uuid.uuid4().hex
+        self.id = id
         self.start = start
         if original_start is None:
             original_start = self.start
@@ -39,29 +50,91 @@ class Transaction(object):
         self.skip = skip
         self.scheduled = scheduled
         self.cleared = cleared
+        # Optional uncertainty, only used by Monte Carlo projections: the
+        # standard deviation of the amount and how many days either side of
+        # its date each occurrence may land.
+        self.amount_stddev = Money(amount_stddev)
+        self.date_jitter = date_jitter
+
+    def __setattr__(self, name, value):
+        # Anyone holding this transaction (e.g. a TransactionStore's
+        # indexes) can observe field changes as observer(t, field, old).
+        observers = self.__dict__.get('_observers')
+        if not observers or name.startswith('_'):
+            object.__setattr__(self, name, value)
+            return
+        old = self.__dict__.get(name)
+        object.__setattr__(self, name, value)
+        for observer in list(observers):
+            observer(self, name, old)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_observers', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if 'id' not in state:
+            self.id = uuid.uuid4().hex
+        if 'amount_stddev' not in state:
+            self.amount_stddev = Money(0)
+        if 'date_jitter' not in state:
+            self.date_jitter = 0
+        self._observers = []
+
+    def addObserver(self, observer):
+        self._observers.append(observer)
+
+    def removeObserver(self, observer):
+        if observer in self._observers:
+            self._observers.remove(observer)
 
     def amtOn(self, trans_date):
-        date = self.start
-        while(True):
-            if date not in self.skip:
-                if date == trans_date:
-                    return self.amount
-                if date > trans_date:
-                    return Money(0)
-                if self.end and trans_date > self.end:
-                    return Money(0)
-                if self.frequency == Transaction.ONCE:
-                    return Money(0)
-            date = self._step_to_next_date(date)
+        index = self._occurrence_index(trans_date)
+        if index is None or trans_date in self.skip:
+            return Money(0)
+        if self.end and trans_date > self.end:
+            # The end date only applies once an unskipped occurrence has
+            # gone by, so a run of skipped leading dates still pays out.
+            skipped = [d for d in self.skip
+                       if d < trans_date and
+                       self._occurrence_index(d) is not None]
+            if len(skipped) < index:
+                return Money(0)
+        return self.amount
+
+    def occurrencesBetween(self, first, last=None):
+        d = self._first_date_on_or_after(first)
+        while d is not None and (last is None or d <= last):
+            if d not in self.skip:
+                if self.end and d > self.end:
+                    # Past the end date only an occurrence preceded by
+                    # nothing but skipped ones can still pay (see amtOn).
+                    amt = self.amtOn(d)
+                    if amt != 0:
+                        yield (d, amt)
+                    return
+                yield (d, self.amount)
+            d = self._step_to_next_date(d)
+
+    def activeRange(self):
+        # First and last dates this transaction can pay out on; last is None
+        # when it never ends.
+        if not self._is_recurring():
+            return (self.start, self.start)
+        if not self.end:
+            return (self.start, None)
+        first_paid = self.start
+        while first_paid in self.skip:
+            first_paid = self._step_to_next_date(first_paid)
+        return (self.start, max(self.end, first_paid))
 
     def updateStartDate(self, base_date):
         if (self.frequency == Transaction.ONCE):
-            date = base_date
+            self.start = base_date
         else:
-            date = self.start
-            while date < base_date:
-                date = self._step_to_next_date(date)
-        self.start = date
+            self.start = self._first_date_on_or_after(base_date)
 
     def updateAmount(self, amount):
         if type(amount) is not Money:
@@ -78,7 +151,73 @@ class Transaction(object):
             frequency=self.frequency,
             skip=self.skip,
             scheduled=self.scheduled,
-            cleared=self.cleared)
+            cleared=self.cleared,
+            amount_stddev=self.amount_stddev,
+            date_jitter=self.date_jitter)
+
+    def _is_recurring(self):
+        return (self.frequency in Transaction.PERIOD_DAYS or
+                self.frequency in Transaction.PERIOD_MONTHS)
+
+    def _occurrence_index(self, d):
+        # Number of steps from self.start to d, or None if d isn't on the
+        # schedule. Skip and end are left to the caller.
+        if d < self.start:
+            return None
+        if self.frequency in Transaction.PERIOD_DAYS:
+            steps, rem = divmod((d - self.start).days,
+                                Transaction.PERIOD_DAYS[self.frequency])
+            return steps if rem == 0 else None
+        if self.frequency in Transaction.PERIOD_MONTHS:
+            steps, rem = divmod((d.year - self.start.year) * 12 +
+                                d.month - self.start.month,
+                                Transaction.PERIOD_MONTHS[self.frequency])
+            if rem == 0 and d.day == self._day_after_steps(steps):
+                return steps
+            return None
+        return 0 if d == self.start else None
+
+    def _first_date_on_or_after(self, d):
+        # Jump straight to the first scheduled date on or after d, ignoring
+        # skip and end. None if there isn't one.
+        if d <= self.start:
+            return self.start
+        if self.frequency in Transaction.PERIOD_DAYS:
+            period = Transaction.PERIOD_DAYS[self.frequency]
+            steps = -(-(d - self.start).days // period)
+            return self.start + timedelta(days=steps * period)
+        if self.frequency in Transaction.PERIOD_MONTHS:
+            months = Transaction.PERIOD_MONTHS[self.frequency]
+            steps = -(-((d.year - self.start.year) * 12 +
+                        d.month - self.start.month) // months)
+            nth = self._date_after_steps(steps)
+            if nth < d:
+                nth = self._date_after_steps(steps + 1)
+            return nth
+        return None
+
+    def _date_after_steps(self, steps):
+        months = Transaction.PERIOD_MONTHS[self.frequency]
+        month_index = (self.start.year * 12 + self.start.month - 1 +
+                       steps * months)
+        year, month = divmod(month_index, 12)
+        return date(year, month + 1, self._day_after_steps(steps))
+
+    def _day_after_steps(self, steps):
+        # Stepping with relativedelta clamps to the end of short months and
+        # never springs back, e.g. Jan 31 -> Feb 28 -> Mar 28. Four years of
+        # steps visits every month of the cycle and a non-leap February, so
+        # the day of month can't shrink any further after that.
+        day = self.start.day
+        if day <= 28:
+            return day
+        months = Transaction.PERIOD_MONTHS[self.frequency]
+        month_index = self.start.year * 12 + self.start.month - 1
+        for _ in range(min(steps, 48 // months)):
+            month_index += months
+            year, month = divmod(month_index, 12)
+            day = min(day, monthrange(year, month + 1)[1])
+        return day
 
     def _step_to_next_date(self, date):
         skip_func = {
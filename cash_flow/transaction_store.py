@@ -1,72 +1,286 @@
 #!/bin/env python
-import yaml
+import copy
+import math
+from bisect import bisect_left, bisect_right, insort
+from collections import deque, namedtuple
+from itertools import islice
 from datetime import date, timedelta
 from dateutil.relativedelta import relativedelta
 from cash_flow.transaction import Transaction
+from cash_flow import yaml_codec
+from cash_flow.atomic_file import atomicOpen
 
 
-class TransactionStore(object):
-    def __init__(self):
-        self.store = []
+Change = namedtuple('Change', ['version', 'kind', 'transaction_id'])
+
+
+class ChangeJournal(object):
+    # Change tracking shared by the store implementations. Every change
+    # bumps version and is recorded in the journal, which only remembers
+    # the most recent journal_length changes.
+    ADDED = "added"
+    REMOVED = "removed"
+    MODIFIED = "modified"
+    JOURNAL_LENGTH = 10000
+
+    def __init__(self, journal_length=JOURNAL_LENGTH):
+        self.version = 0
+        self.journal = deque(maxlen=journal_length)
+        self._subscribers = []
+
+    def subscribe(self, callback):
+        # callback(store, change) is called after every change
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def changesSince(self, version):
+        # Changes made after version, oldest first, or None if the journal
+        # no longer reaches back that far.
+        if version >= self.version:
+            return []
+        if not self.journal or self.journal[0].version > version + 1:
+            return None
+        return list(islice(self.journal,
+                           version + 1 - self.journal[0].version, None))
+
+    def _recordChange(self, kind, transaction_id):
+        self.version += 1
+        change = Change(self.version, kind, transaction_id)
+        self.journal.append(change)
+        for callback in list(self._subscribers):
+            callback(self, change)
+
+
+class TransactionStore(ChangeJournal):
+    def __init__(self, journal_length=ChangeJournal.JOURNAL_LENGTH):
+        super().__init__(journal_length)
+        # Transactions keyed by id, in insertion order
+        self.store = {}
+        # id -> position in the store, so the indexes below can return
+        # transactions in store order however they were edited
+        self._sequence = {}
+        self._next_sequence = 0
+        self._by_description = {}
+        self._by_frequency = {}
+        self._active = _ActiveRanges()
 
     def addTransactions(self, first_transaction, *remaining_transactions):
-        self.store.append(first_transaction)
-        self.store = self.store + list(remaining_transactions)
+        self.addTransactionsFrom((first_transaction,) +
+                                 remaining_transactions)
+
+    def addTransactionsFrom(self, transactions):
+        for t in transactions:
+            old = self.store.get(t.id)
+            if old is not None:
+                self._unindexTransaction(old)
+            else:
+                self._sequence[t.id] = self._next_sequence
+                self._next_sequence += 1
+            self.store[t.id] = t
+            self._indexTransaction(t)
+            self._recordChange(TransactionStore.MODIFIED if old is not None
+                               else TransactionStore.ADDED, t.id)
 
     def replaceTransaction(self, old, new):
         self.removeTransactions(old)
         self.addTransactions(new)
 
     def removeTransactions(self, first_transaction, *remaining_transactions):
-        try:
-            self.store.remove(first_transaction)
-            for t in remaining_transactions:
-                self.store.remove(t)
-        except ValueError:
-            pass
+        self.removeTransactionsFrom((first_transaction,) +
+                                    remaining_transactions)
+
+    def removeTransactionsFrom(self, transactions):
+        # Transactions that aren't in the store are ignored
+        for t in transactions:
+            old = self.store.pop(t.id, None)
+            if old is not None:
+                del self._sequence[t.id]
+                self._unindexTransaction(old)
+                self._recordChange(TransactionStore.REMOVED, t.id)
+
+    def getTransactionById(self, transaction_id):
+        return self.store.get(transaction_id)
+
+    def hasTransaction(self, t):
+        return t.id in self.store
 
     def saveTransactions(self, file):
         try:
-            with open(file, "w") as f:
-                yaml.dump(self.store, f)
+            writeTransactions(file, list(self.store.values()))
         except:
             print(f"Failed to save transactions to {file}.")
 
     def loadTransactions(self, file):
         try:
-            with open(file, "r") as f:
-                self.store = yaml.load(f, Loader=yaml.Loader)
+            store = readTransactions(file)
         except:
             print(f"Failed to load transaction store from {file}.")
+            return
+        self.replaceAll(store)
+
+    def replaceAll(self, transactions):
+        self.removeTransactionsFrom(list(self.store.values()))
+        self.addTransactionsFrom(transactions)
 
     def getTransaction(self, description, requested_date=None):
         # Currently does not handle recurring/overridden transactions
+        transactions = self._inStoreOrder(self._by_description, description)
         if requested_date is None:
-            transactions = [t for t in self.store
-                            if t.description == description]
-        else:
-            transactions = [t for t in self.store
-                            if t.description == description and
-                            t.amtOn(requested_date) != 0]
-        return transactions
+            return transactions
+        return [t for t in transactions if t.amtOn(requested_date) != 0]
 
     def getTransactions(self, frequency=None):
         # TODO: will need to change this when overrides are added
         # Overrides should not be returned with ONCE
         if frequency is None:
-            return self.store
+            return list(self.store.values())
         else:
-            return [t for t in self.store if t.frequency == frequency]
+            return self._inStoreOrder(self._by_frequency, frequency)
+
+    def getActiveTransactions(self, first_date, last_date=None):
+        # Transactions that can pay out somewhere in [first_date, last_date]
+        if last_date is None:
+            last_date = first_date
+        return self._active.overlapping(first_date, last_date)
 
     def updateRecurringStartDates(self, new_date):
-        recurring_trans = [x for x in self.store
+        recurring_trans = [x for x in self.store.values()
                            if x.frequency != Transaction.ONCE]
         for t in recurring_trans:
             t.updateStartDate(new_date)
 
     def purgeSingleBefore(self, purge_date):
-        single_trans = [x for x in self.store
-                        if x.frequency == Transaction.ONCE]
-        for t in single_trans:
-            if t.start < purge_date:
-                self.removeTransactions(t)
+        single_trans = self.getTransactions(frequency=Transaction.ONCE)
+        self.removeTransactionsFrom(t for t in single_trans
+                                    if t.start < purge_date)
+
+    def _indexTransaction(self, t):
+        self._by_description.setdefault(t.description, {})[t.id] = t
+        self._by_frequency.setdefault(t.frequency, {})[t.id] = t
+        self._active.add(t)
+        t.addObserver(self._transactionChanged)
+
+    def _unindexTransaction(self, t):
+        t.removeObserver(self._transactionChanged)
+        self._removeFromBucket(self._by_description, t.description, t)
+        self._removeFromBucket(self._by_frequency, t.frequency, t)
+        self._active.remove(t)
+
+    def _transactionChanged(self, t, field, old):
+        if field == 'description':
+            self._removeFromBucket(self._by_description, old, t)
+            self._by_description.setdefault(t.description, {})[t.id] = t
+        elif field == 'frequency':
+            self._removeFromBucket(self._by_frequency, old, t)
+            self._by_frequency.setdefault(t.frequency, {})[t.id] = t
+        if field in ('start', 'end', 'frequency', 'skip'):
+            self._active.add(t)
+        self._recordChange(TransactionStore.MODIFIED, t.id)
+
+    def _inStoreOrder(self, index, key):
+        return sorted(index.get(key, {}).values(),
+                      key=lambda t: self._sequence[t.id])
+
+    def _removeFromBucket(self, index, key, t):
+        bucket = index.get(key, {})
+        bucket.pop(t.id, None)
+        if not bucket:
+            index.pop(key, None)
+
+
+def readTransactions(file):
+    with open(file, "r") as f:
+        return yaml_codec.loadTransactions(f)
+
+
+def readSnapshot(file):
+    with open(file, "r") as f:
+        return yaml_codec.loadSnapshot(f)
+
+
+def writeTransactions(file, transactions, generation=None):
+    with atomicOpen(file) as f:
+        yaml_codec.dumpTransactions(transactions, f, generation)
+
+
+def snapshotTransactions(transactions):
+    # Detached copies with the same ids, for writing out on another thread
+    # while the originals carry on changing; skip is the only mutable field
+    snapshot = []
+    for t in transactions:
+        t = copy.copy(t)
+        t.skip = set(t.skip)
+        snapshot.append(t)
+    return snapshot
+
+
+class _ActiveRanges(object):
+    # Interval index over each transaction's activeRange(). Bounded ranges
+    # are kept sorted by first date, along with a sorted list of their
+    # lengths, so a query only visits those starting between the window's
+    # start less the longest bounded range and the window's end.
+    # Open-ended ranges overlap every window from their first date on and
+    # are kept sorted apart from the rest. All three lists are updated in
+    # place with bisect as transactions come, go and change.
+    def __init__(self):
+        # id -> (sequence, first, last or None, transaction)
+        self.ranges = {}
+        self.sequence = 0
+        # (first, sequence, id), sorted
+        self.bounded = []
+        self.open_ended = []
+        # (last - first).days of every bounded range, sorted
+        self.lengths = []
+
+    def add(self, t):
+        (first, last) = t.activeRange()
+        entry = self.ranges.get(t.id)
+        if entry is not None:
+            seq = entry[0]
+            self._unlink(t.id, entry)
+        else:
+            seq = self.sequence
+            self.sequence += 1
+        self.ranges[t.id] = (seq, first, last, t)
+        if last is None:
+            insort(self.open_ended, (first, seq, t.id))
+        else:
+            insort(self.bounded, (first, seq, t.id))
+            insort(self.lengths, (last - first).days)
+
+    def remove(self, t):
+        entry = self.ranges.pop(t.id, None)
+        if entry is not None:
+            self._unlink(t.id, entry)
+
+    def overlapping(self, first_date, last_date):
+        # Transactions whose range meets [first_date, last_date], in the
+        # order they were added
+        end = bisect_right(self.open_ended, (last_date, math.inf))
+        found = [(seq, transaction_id) for (_, seq, transaction_id)
+                 in self.open_ended[:end]]
+        if self.lengths:
+            try:
+                earliest = first_date - timedelta(days=self.lengths[-1])
+            except OverflowError:
+                earliest = date.min
+            lo = bisect_left(self.bounded, (earliest,))
+            hi = bisect_right(self.bounded, (last_date, math.inf))
+            found.extend((seq, transaction_id)
+                         for (_, seq, transaction_id) in self.bounded[lo:hi]
+                         if self.ranges[transaction_id][2] >= first_date)
+        found.sort()
+        return [self.ranges[transaction_id][3]
+                for (_, transaction_id) in found]
+
+    def _unlink(self, transaction_id, entry):
+        (seq, first, last, _) = entry
+        key = (first, seq, transaction_id)
+        if last is None:
+            del self.open_ended[bisect_left(self.open_ended, key)]
+        else:
+            del self.bounded[bisect_left(self.bounded, key)]
+            del self.lengths[bisect_left(self.lengths, (last - first).days)]
@@ -0,0 +1,144 @@
+#!/bin/env python
+
+import yaml
+from decimal import Decimal
+from cash_flow.money import Money
+from cash_flow.transaction import Transaction
+from cash_flow.app_settings import AppSettings
+
+
+# Files are mappings of plain YAML types with a format version:
+#   version: 1
+#   generation: 3
+#   transactions: [{id: ..., start: 2021-01-29, amount: '12.50', ...}]
+# or, for settings,
+#   version: 1
+#   settings: {startDate: 2021-01-29, startBalance: '0.00', ...}
+# Amounts are strings so they load back exactly. generation is optional
+# and only written for ChangeLog snapshots. Older files, which are bare
+# !!python/object dumps, still load; see Loader.
+FORMAT_VERSION = 1
+
+# version -> function taking a document of that version to the next one
+MIGRATIONS = {}
+
+# libyaml's safe loader and dumper when PyYAML was built with it
+_SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+Dumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+
+class Loader(_SafeLoader):
+    # Safe loading, plus the few !!python tags written by versions that
+    # dumped objects directly. Only the classes below are recognised and
+    # none of their code runs beyond __setstate__; any other Python tag
+    # is refused as before.
+    LEGACY_CLASSES = {
+        'cash_flow.transaction.Transaction': Transaction,
+        'cash_flow.money.Money': Money,
+        'cash_flow.app_settings.AppSettings': AppSettings,
+        'cash_flow_calculator.AppSettings': AppSettings,
+        '__main__.AppSettings': AppSettings,
+    }
+
+
+def _legacyObject(loader, suffix, node):
+    cls = Loader.LEGACY_CLASSES.get(suffix)
+    if cls is None:
+        raise yaml.constructor.ConstructorError(
+            None, None, f"can't load python object {suffix!r}",
+            node.start_mark)
+    state = loader.construct_mapping(node, deep=True)
+    obj = cls.__new__(cls)
+    if hasattr(obj, '__setstate__'):
+        obj.__setstate__(state)
+    else:
+        obj.__dict__.update(state)
+    return obj
+
+
+def _legacyDecimal(loader, node):
+    return Decimal(*loader.construct_sequence(node))
+
+
+Loader.add_multi_constructor('tag:yaml.org,2002:python/object:',
+                             _legacyObject)
+Loader.add_constructor('tag:yaml.org,2002:python/object/apply:'
+                       'decimal.Decimal', _legacyDecimal)
+
+
+def dumpTransactions(transactions, stream=None, generation=None):
+    document = {'version': FORMAT_VERSION}
+    if generation is not None:
+        document['generation'] = generation
+    document['transactions'] = [transactionToDict(t) for t in transactions]
+    return _dump(document, stream)
+
+
+def loadTransactions(stream):
+    return loadSnapshot(stream)[0]
+
+
+def loadSnapshot(stream):
+    # (transactions, generation), generation being 0 when not recorded
+    # and None for an unversioned file, which has no stored ids
+    document = yaml.load(stream, Loader=Loader)
+    if document is None:
+        return ([], 0)
+    if isinstance(document, list):
+        # Unversioned: already Transactions, with new ids on every load
+        return (document, None)
+    document = _upgrade(document)
+    return ([transactionFromDict(t) for t in document['transactions']],
+            document.get('generation', 0))
+
+
+def dumpSettings(settings, stream=None):
+    return _dump({'version': FORMAT_VERSION,
+                  'settings': {'startDate': settings.startDate,
+                               'startBalance': settings.startBalance,
+                               'warning': settings.warning,
+                               'dataFile': settings.dataFile}}, stream)
+
+
+def loadSettings(stream):
+    document = yaml.load(stream, Loader=Loader)
+    if isinstance(document, AppSettings):
+        return document
+    return AppSettings(**_upgrade(document)['settings'])
+
+
+def transactionToDict(t):
+    return {'id': t.id,
+            'start': t.start,
+            'original_start': t.original_start,
+            'end': t.end,
+            'description': t.description,
+            'amount': str(Money(t.amount)),
+            'frequency': t.frequency,
+            'skip': sorted(t.skip),
+            'scheduled': t.scheduled,
+            'cleared': t.cleared,
+            'amount_stddev': str(Money(t.amount_stddev)),
+            'date_jitter': t.date_jitter}
+
+
+def transactionFromDict(fields):
+    fields = dict(fields)
+    fields['amount'] = Money(fields.get('amount'))
+    fields['amount_stddev'] = Money(fields.get('amount_stddev'))
+    fields['skip'] = set(fields.get('skip') or [])
+    return Transaction(**fields)
+
+
+def _dump(document, stream):
+    return yaml.dump(document, stream, Dumper=Dumper, sort_keys=False)
+
+
+def _upgrade(document):
+    version = document.get('version')
+    if not isinstance(version, int) or version > FORMAT_VERSION:
+        raise ValueError(f"unsupported file format version {version!r}")
+    while version < FORMAT_VERSION:
+        document = MIGRATIONS[version](document)
+        version = document['version']
+    return document
@@ -1,6 +1,5 @@
 #!/usr/bin/env python
 import os
-import yaml
 import string
 import re
 import wx
@@ -9,6 +8,14 @@ from datetime import date, timedelta
 from cash_flow.transaction import Transaction
 from cash_flow.transaction_store import TransactionStore
 from cash_flow.cash_flow import CashFlow
+from cash_flow.money import Money
+from cash_flow.app_settings import AppSettings
+from cash_flow import yaml_codec
+from cash_flow.change_log import ChangeLog
+from cash_flow.background_save import BackgroundSaver
+from cash_flow.atomic_file import atomicOpen
+from cash_flow.thresholds import intervalsBelow, inIntervals
+from cash_flow.rollup import rollup, WEEK, MONTH, QUARTER, YEAR
 
 
 def wxDate2pyDate(wxdate):
@@ -18,30 +25,15 @@ def pyDate2wxDate(pyDate):
     return wx.DateTime(pyDate.day, pyDate.month-1, pyDate.year)
 
 
-class AppSettings():
-    def __init__(self, startDate=None, startBalance=None, warning=None, dataFile=None):
-        if startDate is None:
-            startDate = date.today()
-        self.startDate = startDate
-
-        if startBalance is None:
-            startBalance = '0.00'
-        self.startBalance = startBalance
-
-        if warning is None:
-            warning = 100.00
-        self.warning = warning
-
-        if dataFile is None:
-            dataFile = ""
-        self.dataFile = dataFile
-
-
 class CashFlowDisplay(wx.Panel):
     def __init__(self, parent, ts, settings):
         super().__init__(parent)
         self.ts = ts
         self.settings = settings
+        # What the list was last built from, to skip needless rebuilds
+        self.shown = None
+        self.projection = None
+        self.projection_ts = None
         self.main_sizer = wx.BoxSizer(wx.VERTICAL)
         # Controls at top
         self.control_sizer = wx.BoxSizer(wx.HORIZONTAL)
@@ -57,7 +49,12 @@ class CashFlowDisplay(wx.Panel):
         self.starting_balance = wx.TextCtrl(self, value=self.settings.startBalance)
         self.starting_balance.Bind(wx.EVT_TEXT, self.handleSettingsChange)
         self.control_sizer.Add(self.starting_balance, 0)
+        btn = wx.Button(self, label='Minimum Safe Balance')
+        btn.Bind(wx.EVT_BUTTON, self.fillMinimumBalance)
+        self.control_sizer.Add(btn, 0)
         self.main_sizer.Add(self.control_sizer, 0)
+        self.lowest_balance = wx.StaticText(self, label='')
+        self.main_sizer.Add(self.lowest_balance, 0)
         # List of transactions
         self.list_sizer = wx.BoxSizer(wx.VERTICAL)
         self.main_sizer.Add(self.list_sizer, 0, wx.EXPAND)
@@ -73,8 +70,23 @@ class CashFlowDisplay(wx.Panel):
         starting_balance = self.starting_balance.GetValue()
         allow = string.digits + "."
         starting_balance = re.sub('[^%s]' % allow, '', starting_balance)
-        cf = CashFlow(start_date, starting_balance, self.ts)
-        day = cf.getTodaysTransactions()
+        shown = (self.ts, self.ts.version, start_date, starting_balance,
+                 self.settings.warning)
+        if shown == self.shown:
+            return
+        self.shown = shown
+        if (self.projection is None or
+                self.projection.start_date != start_date or
+                self.projection_ts is not self.ts):
+            cf = CashFlow(start_date, starting_balance, self.ts)
+            self.projection = cf.project(horizon_days=365)
+            self.projection_ts = self.ts
+        else:
+            # Only redo the work for transactions edited since last time
+            self.projection.sync(self.ts)
+            self.projection.setStartBalance(starting_balance)
+        (low_date, low) = self.projection.lowestBalance()
+        self.lowest_balance.SetLabel(f'Lowest balance: ${low} on {low_date}')
         self.list_sizer.Clear(delete_windows=True)
         listCtrl = wx.ListCtrl(self, style=wx.LC_REPORT)
         listCtrl.InsertColumn(0, "Date")
@@ -85,16 +97,17 @@ class CashFlowDisplay(wx.Panel):
         listCtrl.SetColumnWidth(1, 100)
         listCtrl.SetColumnWidth(2, 200)
         listCtrl.SetColumnWidth(3, 75)
-        for i in range(0, 365):
-            (d, bal, t_list) = next(day)
+        (warning, overdrawn) = intervalsBelow(self.projection,
+                                              self.settings.warning, 0)
+        for (d, bal, t_list) in self.projection.transactionDays():
             if t_list:
                 # Add daily summary
                 index = listCtrl.InsertItem(listCtrl.GetItemCount(), str(d))
                 listCtrl.SetItem(index, 1, str(bal))
-                if bal < self.settings.warning:
-                    listCtrl.SetItemBackgroundColour(index, wx.Colour(255, 255, 0))
-                if bal < 0:
+                if inIntervals(overdrawn, d):
                     listCtrl.SetItemBackgroundColour(index, wx.Colour(255, 0, 0))
+                elif inIntervals(warning, d):
+                    listCtrl.SetItemBackgroundColour(index, wx.Colour(255, 255, 0))
                 # Add individual transactions
                 for t in t_list:
                     index = listCtrl.InsertItem(listCtrl.GetItemCount(), "")
@@ -106,6 +119,13 @@ class CashFlowDisplay(wx.Panel):
         self.list_sizer.Add(listCtrl, 0, wx.EXPAND)
         self.main_sizer.Layout()
 
+    def fillMinimumBalance(self, event):
+        # Smallest starting balance that stays clear of the warning level;
+        # the box only takes non-negative amounts
+        self.updateList()
+        balance = self.projection.minimumStartBalance(self.settings.warning)
+        self.starting_balance.SetValue(str(max(balance, Money(0))))
+
     def updateSettings(self):
         self.settings.startDate = wxDate2pyDate(self.date_picker.GetValue())
         self.settings.startBalance = self.starting_balance.GetValue()
@@ -118,6 +138,73 @@ class CashFlowDisplay(wx.Panel):
         # TODO: set warning once control is exposed
 
 
+class SummaryDisplay(wx.Panel):
+    PERIODS = [("Weekly", WEEK), ("Monthly", MONTH), ("Quarterly", QUARTER),
+               ("Yearly", YEAR)]
+
+    def __init__(self, parent, ts, settings):
+        super().__init__(parent)
+        self.ts = ts
+        self.settings = settings
+        # What the list was last built from, to skip needless rebuilds
+        self.shown = None
+        self.main_sizer = wx.BoxSizer(wx.VERTICAL)
+        # Controls at top
+        self.control_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        self.period = wx.Choice(self, choices=[label for (label, _)
+                                               in self.PERIODS])
+        self.period.SetSelection(1)
+        self.period.Bind(wx.EVT_CHOICE, self.handleChange)
+        self.control_sizer.Add(self.period, 0)
+        label = wx.StaticText(self, label='Years')
+        self.control_sizer.Add(label, 0)
+        self.years = wx.SpinCtrl(self, min=1, max=50, initial=1)
+        self.years.Bind(wx.EVT_SPINCTRL, self.handleChange)
+        self.control_sizer.Add(self.years, 0)
+        self.main_sizer.Add(self.control_sizer, 0)
+        # List of periods
+        self.list_sizer = wx.BoxSizer(wx.VERTICAL)
+        self.main_sizer.Add(self.list_sizer, 0, wx.EXPAND)
+        self.SetSizer(self.main_sizer)
+
+    def handleChange(self, event):
+        self.updateList()
+
+    def updateList(self):
+        allow = string.digits + "."
+        starting_balance = re.sub('[^%s]' % allow, '',
+                                  self.settings.startBalance)
+        period = self.PERIODS[self.period.GetSelection()][1]
+        horizon_days = round(365.25 * self.years.GetValue())
+        shown = (self.ts, self.ts.version, self.settings.startDate,
+                 starting_balance, period, horizon_days)
+        if shown == self.shown:
+            return
+        self.shown = shown
+        cf = CashFlow(self.settings.startDate, starting_balance, self.ts)
+        summary = rollup(cf.project(horizon_days=horizon_days), period)
+        self.list_sizer.Clear(delete_windows=True)
+        listCtrl = wx.ListCtrl(self, style=wx.LC_REPORT)
+        for (column, heading) in enumerate(["Period", "In", "Out", "Net",
+                                            "Ending", "Lowest"]):
+            listCtrl.InsertColumn(column, heading)
+            listCtrl.SetColumnWidth(column, 100)
+        for row in summary.rows():
+            index = listCtrl.InsertItem(listCtrl.GetItemCount(), str(row[0]))
+            for (column, amount) in enumerate(row[1:], 1):
+                listCtrl.SetItem(index, column, str(amount))
+            if row[5] < 0:
+                listCtrl.SetItemBackgroundColour(index, wx.Colour(255, 0, 0))
+            elif row[5] < self.settings.warning:
+                listCtrl.SetItemBackgroundColour(index,
+                                                 wx.Colour(255, 255, 0))
+        self.list_sizer.Add(listCtrl, 1, wx.EXPAND)
+        self.main_sizer.Layout()
+
+    def loadSettings(self):
+        pass
+
+
 class TransactionManagement(wx.Panel):
     def __init__(self, parent, ts, settings):
         super().__init__(parent)
@@ -125,6 +212,8 @@ class TransactionManagement(wx.Panel):
         self.settings = settings
         self.editPane1 = None
         self.transaction_buttons = {}
+        # Store and version the buttons were last built from
+        self.shown = None
         self.main_sizer = wx.BoxSizer(wx.HORIZONTAL)
         self.left_side_sizer = wx.BoxSizer(wx.VERTICAL)
         self.t_list_sizer = wx.BoxSizer(wx.VERTICAL)
@@ -137,7 +226,8 @@ class TransactionManagement(wx.Panel):
 
     def redraw(self):
         self.clearEditPane()
-        self.rebuildTransactionButtons()
+        if self.shown != (self.ts, self.ts.version):
+            self.rebuildTransactionButtons()
 
     def loadSettings(self):
         pass
@@ -155,6 +245,7 @@ class TransactionManagement(wx.Panel):
         self.transaction_buttons = {}
         for t in self.ts.getTransactions():
             self.updateButtonForTransaction(t)
+        self.shown = (self.ts, self.ts.version)
         self.main_sizer.Layout()
 
     def editTransaction(self, event, trans):
@@ -173,15 +264,15 @@ class TransactionManagement(wx.Panel):
 
     def updateButtonForTransaction(self, t):
         label = f'{t.description} {t.amount} {t.start}'
-        if t in self.transaction_buttons:
-            btn = self.transaction_buttons[t]
+        if t.id in self.transaction_buttons:
+            btn = self.transaction_buttons[t.id]
             btn.SetLabel(label)
         else:
             btn = wx.Button(self, label=label)
             btn.Bind(wx.EVT_BUTTON, lambda evt, trans=t: self.editTransaction(evt, trans))
             self.t_list_sizer.Add(btn, 0)
-            self.transaction_buttons[t] = btn
-        if t not in self.ts.getTransactions():
+            self.transaction_buttons[t.id] = btn
+        if not self.ts.hasTransaction(t):
             self.ts.addTransactions(t)
         self.t_list_sizer.Layout()
 
@@ -307,6 +398,9 @@ class MainFrame(wx.Frame):
         self.settingsFile = os.getcwd()+'/data/'+'.cash_flow_settings.yml'
         self.settings = AppSettings()
         self.ts = TransactionStore()
+        self.change_log = None
+        # Files are written on a worker thread; see saveTransactions
+        self.saver = BackgroundSaver(wx.CallAfter, self.saveFinished)
         self.defaultDir = os.getcwd()+'/data'
         self.notebook = wx.Notebook(self)
         self.notebook.Bind(wx.EVT_NOTEBOOK_PAGE_CHANGED, self.handleNotebookChange)
@@ -314,8 +408,12 @@ class MainFrame(wx.Frame):
         self.notebook.AddPage(self.transactionManagement, "Transaction Management")
         self.cashFlowDisplay = CashFlowDisplay(self.notebook, self.ts, self.settings)
         self.notebook.AddPage(self.cashFlowDisplay, "Cash Flow")
+        self.summaryDisplay = SummaryDisplay(self.notebook, self.ts, self.settings)
+        self.notebook.AddPage(self.summaryDisplay, "Summary")
         self.SetInitialSize(wx.Size(650, 650))
         self.create_menu()
+        self.CreateStatusBar()
+        self.Bind(wx.EVT_CLOSE, self.on_close)
         self.loadSettings()
         self.loadTransactions(self.settings.dataFile)
         self.Show()
@@ -329,6 +427,8 @@ class MainFrame(wx.Frame):
         self.transactionManagement.redraw()
         self.cashFlowDisplay.loadSettings()
         self.cashFlowDisplay.updateList()
+        self.summaryDisplay.loadSettings()
+        self.summaryDisplay.updateList()
 
     def create_menu(self):
         menu_bar = wx.MenuBar()
@@ -368,8 +468,14 @@ class MainFrame(wx.Frame):
         )
         self.SetMenuBar(menu_bar)
 
+    def on_close(self, event):
+        # Queued saves only start from the event loop, which is about to
+        # stop; finish them here before the window goes
+        self.saver.flush()
+        event.Skip()
+
     def on_new_file(self, event):
-        self.loadSettings()
+        self.refreshSettings()
         self.settings.dataFile = None
         self.saveSettings()
         self.loadTransactions()
@@ -385,7 +491,7 @@ class MainFrame(wx.Frame):
                   wx.FD_PREVIEW
             )
         if dlg.ShowModal() == wx.ID_OK:
-            self.loadSettings()
+            self.refreshSettings()
             self.settings.dataFile = dlg.GetPath()
             self.loadTransactions(self.settings.dataFile)
             self.saveSettings()
@@ -416,32 +522,73 @@ class MainFrame(wx.Frame):
         dlg.Destroy()
 
     def loadTransactions(self, file=None):
+        if self.change_log is not None:
+            self.change_log.close()
+            self.change_log = None
         self.ts = TransactionStore()
         if file is not None:
-            self.ts.loadTransactions(file)
+            self.change_log = ChangeLog(self.ts, file)
+            try:
+                self.change_log.load()
+            except Exception:
+                print(f"Failed to load transaction store from {file}.")
         self.transactionManagement.ts = self.ts
         self.cashFlowDisplay.ts = self.ts
+        self.summaryDisplay.ts = self.ts
         self.updateChildren()
 
     def saveTransactions(self, file=None):
         if file is None:
             file = self.settings.dataFile
         self.settings.dataFile = file
-        self.ts.saveTransactions(file)
+        # Saving to the open file appends the changes since the last save
+        # to its log; a new file starts with a full snapshot. The store is
+        # snapshotted here and written out in the background.
+        if self.change_log is None or self.change_log.path != file:
+            if self.change_log is not None:
+                self.change_log.close()
+            self.change_log = ChangeLog(self.ts, file)
+        self.saver.submit(('transactions', file), self.change_log.prepareSave)
+        self.SetStatusText("Saving...")
 
     def saveSettings(self):
-        try:
-            with open(self.settingsFile, "w") as f:
-                yaml.dump(self.settings, f)
-        except:
-            print("Can't save settings for some reason.")
+        self.saver.submit(('settings', self.settingsFile),
+                          self.prepareSettingsSave)
+        self.SetStatusText("Saving...")
+
+    def prepareSettingsSave(self):
+        text = yaml_codec.dumpSettings(self.settings)
+        path = self.settingsFile
+
+        def job():
+            with atomicOpen(path) as f:
+                f.write(text)
+        return job
+
+    def saveFinished(self, key, error):
+        if not self:
+            # The window has been destroyed
+            return
+        (kind, file) = key
+        if error is not None:
+            print(f"Failed to save {kind} to {file}: {error}")
+            self.SetStatusText(f"Failed to save {kind}")
+        elif not self.saver.busy:
+            self.SetStatusText("Saved")
+
+    def refreshSettings(self):
+        # While a save of the settings is queued or running, the ones in
+        # memory are newer than the file
+        if not self.saver.pending(('settings', self.settingsFile)):
+            self.loadSettings()
 
     def loadSettings(self):
         try:
             with open(self.settingsFile, "r") as f:
-                self.settings = yaml.load(f, Loader=yaml.Loader)
+                self.settings = yaml_codec.loadSettings(f)
             self.transactionManagement.settings = self.settings
             self.cashFlowDisplay.settings = self.settings
+            self.summaryDisplay.settings = self.settings
             self.updateChildren()
         except:
             print("Can't load settings file. Using defaults.")
@@ -1,3 +1,32 @@
 import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from datetime import timedelta  # noqa: E402
+from cash_flow.transaction import Transaction  # noqa: E402
+from cash_flow.transaction_store import TransactionStore  # noqa: E402
+
+
+# A store exercising each kind of transaction, shared by the tests
+def makeStore(sd):
+    ts = TransactionStore()
+    ts.addTransactions(
+        Transaction(start=sd, description="Once", amount=-5.00,
+                    frequency=Transaction.ONCE),
+        Transaction(start=sd+timedelta(days=3), description="Weekly",
+                    amount=-1.02, frequency=Transaction.WEEKLY,
+                    skip=set([sd+timedelta(days=17)])),
+        Transaction(start=sd-timedelta(days=10), description="Biweekly",
+                    amount=12.50, frequency=Transaction.BIWEEKLY,
+                    end=sd+timedelta(days=300)),
+        Transaction(start=sd+timedelta(days=2), description="Monthly",
+                    amount=-3.33, frequency=Transaction.MONTHLY,
+                    end=sd+timedelta(days=200)),
+        Transaction(start=sd, description="Zero", amount=0.00,
+                    frequency=Transaction.WEEKLY),
+        Transaction(start=sd-timedelta(days=40), description="Quarterly",
+                    amount=7.00, frequency=Transaction.QUARTERLY),
+        Transaction(start=sd+timedelta(days=1), description="Weekly end",
+                    amount=2.00, frequency=Transaction.WEEKLY,
+                    end=sd+timedelta(days=90),
+                    skip=set([sd+timedelta(days=8)])))
+    return ts
@@ -0,0 +1,99 @@
+#!/bin/env python
+import unittest
+import asyncio
+import os
+import tempfile
+import numpy as np
+from datetime import date
+import context
+from cash_flow.transaction_store import TransactionStore
+from cash_flow.sqlite_store import SQLiteTransactionStore
+from cash_flow.cash_flow import CashFlow
+from cash_flow import aio
+from context import makeStore
+
+
+class TestAsyncProjection(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.sd = date(2021, 1, 29)
+        self.ts = makeStore(self.sd)
+        self.cf = CashFlow(self.sd, 100.00, self.ts)
+
+    async def test_project(self):
+        projection = await aio.project(self.cf, horizon_days=500)
+        self.assertEqual(projection.version, self.ts.version)
+        self.assertTrue(np.array_equal(
+            projection.balances, self.cf.project(horizon_days=500).balances))
+
+    async def test_transaction_days(self):
+        days = [day async for day in
+                aio.transactionDays(self.cf, horizon_days=400,
+                                    chunk_days=30)]
+        # The projection holds copies of the transactions, with the same ids
+        expected = self.cf.project(horizon_days=400).transactionDays()
+        self.assertEqual(
+            [(d, balance, [t.id for t in ts]) for (d, balance, ts) in days],
+            [(d, balance, [t.id for t in ts]) for (d, balance, ts)
+             in expected])
+
+    async def test_other_tasks_run_between_chunks(self):
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(len(ticks))
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(ticker())
+        async for day in aio.transactionDays(self.cf, horizon_days=365 * 5,
+                                             chunk_days=30):
+            pass
+        task.cancel()
+        self.assertGreater(len(ticks), 10)
+
+    async def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'transactions')
+            save = aio.saveTransactions(self.ts, path)
+            # Changes made after the call aren't saved
+            saving = asyncio.create_task(save)
+            await asyncio.sleep(0)
+            first = next(iter(self.ts.store.values()))
+            first.description = "Changed"
+            await saving
+            loaded = TransactionStore()
+            await aio.loadTransactions(loaded, path)
+            self.assertEqual(set(loaded.store), set(self.ts.store))
+            self.assertNotEqual(loaded.store[first.id].description,
+                                "Changed")
+
+    async def test_project_ignores_later_edits(self):
+        expected = self.cf.project(horizon_days=500).balances
+        projecting = asyncio.create_task(
+            aio.project(self.cf, horizon_days=500))
+        await asyncio.sleep(0)
+        for t in self.ts.getTransactions():
+            t.amount = 1000.00
+        projection = await projecting
+        self.assertLess(projection.version, self.ts.version)
+        self.assertTrue(np.array_equal(projection.balances, expected))
+
+    async def test_save_sqlite_store(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = SQLiteTransactionStore(os.path.join(directory, 'db'))
+            store.addTransactionsFrom(self.ts.getTransactions())
+            path = os.path.join(directory, 'transactions')
+            await aio.saveTransactions(store, path)
+            store.close()
+            loaded = TransactionStore()
+            await aio.loadTransactions(loaded, path)
+            self.assertEqual(set(loaded.store), set(self.ts.store))
+
+    async def test_failed_load_leaves_store(self):
+        version = self.ts.version
+        await aio.loadTransactions(self.ts, '/nonexistent/transactions')
+        self.assertEqual(self.ts.version, version)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,170 @@
+#!/bin/env python
+import unittest
+import os
+import queue
+import stat
+import tempfile
+import threading
+from datetime import date
+import context
+from cash_flow.transaction import Transaction
+from cash_flow.transaction_store import TransactionStore
+from cash_flow.change_log import ChangeLog
+from cash_flow.background_save import BackgroundSaver
+from cash_flow.atomic_file import atomicOpen
+from context import makeStore
+
+
+class TestAtomicOpen(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'file.yml')
+        with open(self.path, "w") as f:
+            f.write("old")
+        os.chmod(self.path, 0o640)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_replaces_file(self):
+        with atomicOpen(self.path) as f:
+            f.write("new")
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "new")
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o640)
+        self.assertEqual(os.listdir(self.directory.name), ['file.yml'])
+
+    def test_new_file_follows_umask(self):
+        path = os.path.join(self.directory.name, 'new.yml')
+        umask = os.umask(0o022)
+        try:
+            with atomicOpen(path) as f:
+                f.write("new")
+        finally:
+            os.umask(umask)
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o644)
+
+    def test_failure_keeps_old_file(self):
+        with self.assertRaises(RuntimeError):
+            with atomicOpen(self.path) as f:
+                f.write("half")
+                raise RuntimeError("disk full")
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "old")
+        self.assertEqual(os.listdir(self.directory.name), ['file.yml'])
+
+
+class TestBackgroundSaver(unittest.TestCase):
+    def setUp(self):
+        # Stands in for the GUI's event queue
+        self.events = queue.Queue()
+        self.done = []
+        self.saver = BackgroundSaver(
+            lambda function, *args: self.events.put((function, args)),
+            lambda key, error: self.done.append((key, error)))
+
+    def drain(self):
+        while self.saver.busy:
+            (function, args) = self.events.get(timeout=10)
+            function(*args)
+
+    def test_repeated_saves_collapse(self):
+        release = threading.Event()
+        prepared = []
+        written = []
+
+        def prepare(value):
+            def job():
+                if value == 0:
+                    release.wait(10)
+                written.append(value)
+            return lambda: (prepared.append(value), job)[1]
+
+        self.saver.submit('a', prepare(0))
+        self.assertTrue(self.saver.busy)
+        for value in range(1, 5):
+            self.saver.submit('a', prepare(value))
+        self.saver.submit('b', prepare(9))
+        release.set()
+        self.drain()
+        # The first was already running; the rest collapse into the first
+        # that was still waiting
+        self.assertEqual(prepared, [0, 1, 9])
+        self.assertEqual(written, [0, 1, 9])
+        self.assertEqual([key for (key, _) in self.done], ['a', 'a', 'b'])
+        self.assertTrue(self.saver.wait(0))
+
+    def test_errors_are_reported(self):
+        def failing():
+            raise OSError("read-only file system")
+        self.saver.submit('a', lambda: failing)
+        self.drain()
+        ((key, error),) = self.done
+        self.assertIsInstance(error, OSError)
+
+    def test_flush_without_the_event_queue(self):
+        release = threading.Event()
+        written = []
+
+        def prepare(value):
+            def job():
+                if value == 0:
+                    release.wait(10)
+                written.append(value)
+            return lambda: job
+
+        self.saver.submit('a', prepare(0))
+        self.saver.submit('b', prepare(1))
+        self.assertTrue(self.saver.pending('b'))
+        self.assertFalse(self.saver.pending('c'))
+        release.set()
+        # As when closing: nothing hands saves back through the queue
+        self.saver.flush()
+        self.assertEqual(written, [0, 1])
+        self.assertEqual(self.done, [('a', None), ('b', None)])
+        self.assertFalse(self.saver.busy)
+        self.assertTrue(self.saver.wait(0))
+        # Hand-offs still queued from the workers are ignored
+        while not self.events.empty():
+            (function, args) = self.events.get()
+            function(*args)
+        self.assertEqual(len(self.done), 2)
+
+    def test_change_log_in_background(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'book.yml')
+            ts = makeStore(date(2021, 1, 29))
+            log = ChangeLog(ts, path)
+            self.saver.submit('book', log.prepareSave)
+            # Changes after the snapshot don't leak into it...
+            ts.getTransaction("Weekly")[0].description = "Changed"
+            self.drain()
+            loaded = TransactionStore()
+            ChangeLog(loaded, path).load()
+            self.assertEqual(loaded.getTransaction("Changed"), [])
+            # ...and go into the next save
+            self.saver.submit('book', log.prepareSave)
+            self.drain()
+            ChangeLog(loaded, path).load()
+            self.assertEqual(len(loaded.getTransaction("Changed")), 1)
+
+    def test_failed_log_write_forces_snapshot(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'book.yml')
+            ts = makeStore(date(2021, 1, 29))
+            log = ChangeLog(ts, path)
+            log.save()
+            ts.addTransactions(Transaction(description="New"))
+            os.mkdir(log.log_path)
+            with self.assertRaises(OSError):
+                log.save()
+            self.assertTrue(log.needs_snapshot)
+            os.rmdir(log.log_path)
+            log.save()
+            loaded = TransactionStore()
+            ChangeLog(loaded, path).load()
+            self.assertEqual(len(loaded.getTransaction("New")), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
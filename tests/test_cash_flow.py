@@ -86,5 +86,97 @@ class TestGenerator(unittest.TestCase):
             self.assertEqual(bal, self.cf.start_balance + st.amount)
 
 
+class TestTransactionDays(unittest.TestCase):
+    def setUp(self):
+        sd = date(2021, 1, 29)
+        self.ts = TransactionStore()
+        self.ts.addTransactions(
+            Transaction(start=sd, description="Once", amount=-5.00,
+                        frequency=Transaction.ONCE),
+            Transaction(start=sd+timedelta(days=3), description="Weekly",
+                        amount=-1.02, frequency=Transaction.WEEKLY,
+                        skip=set([sd+timedelta(days=17)])),
+            Transaction(start=sd-timedelta(days=10), description="Biweekly",
+                        amount=12.50, frequency=Transaction.BIWEEKLY),
+            Transaction(start=sd+timedelta(days=2), description="Monthly",
+                        amount=-3.33, frequency=Transaction.MONTHLY,
+                        end=sd+timedelta(days=200)),
+            Transaction(start=sd, description="Zero", amount=0.00,
+                        frequency=Transaction.WEEKLY),
+            Transaction(start=sd-timedelta(days=40), description="Quarterly",
+                        amount=7.00, frequency=Transaction.QUARTERLY))
+        self.sd = sd
+
+    def test_matches_daily_generator(self):
+        daily = CashFlow(self.sd, 100.00, self.ts).getTodaysTransactions()
+        expected = []
+        for i in range(400):
+            (d, bal, t_list) = next(daily)
+            if t_list:
+                expected.append((d, bal, t_list))
+        end = self.sd + timedelta(days=399)
+        cf = CashFlow(self.sd, 100.00, self.ts)
+        actual = list(cf.getTransactionDays(end))
+        self.assertEqual(actual, expected)
+        self.assertEqual(cf.current_date, expected[-1][0])
+        self.assertEqual(cf.current_balance, expected[-1][1])
+
+    def test_unbounded(self):
+        cf = CashFlow(self.sd, 100.00, self.ts)
+        days = cf.getTransactionDays()
+        for i in range(50):
+            (d, bal, t_list) = next(days)
+            self.assertEqual(d, cf.current_date)
+            self.assertTrue(t_list)
+
+
+class TestBalanceOn(unittest.TestCase):
+    def setUp(self):
+        self.sd = date(2021, 1, 29)
+        self.ts = TransactionStore()
+        self.weekly = Transaction(start=self.sd+timedelta(days=3),
+                                  description="Weekly", amount=-1.02,
+                                  frequency=Transaction.WEEKLY)
+        self.ts.addTransactions(
+            Transaction(start=self.sd, description="Once", amount=-5.00,
+                        frequency=Transaction.ONCE),
+            self.weekly,
+            Transaction(start=self.sd+timedelta(days=2),
+                        description="Monthly", amount=-3.33,
+                        frequency=Transaction.MONTHLY),
+            Transaction(start=self.sd-timedelta(days=40),
+                        description="Quarterly", amount=70.00,
+                        frequency=Transaction.QUARTERLY))
+        self.cf = CashFlow(self.sd, 100.00, self.ts)
+
+    def expectedBalances(self, days):
+        day = CashFlow(self.sd, 100.00, self.ts).getTodaysTransactions()
+        return [next(day)[1] for i in range(days)]
+
+    def test_every_day(self):
+        expected = self.expectedBalances(500)
+        dates = [self.sd + timedelta(days=i) for i in range(500)]
+        self.assertEqual(self.cf.balancesAt(dates), expected)
+
+    def test_single_date(self):
+        expected = self.expectedBalances(45)
+        self.assertEqual(self.cf.balanceOn(self.sd+timedelta(days=44)),
+                         expected[44])
+
+    def test_far_future_and_store_changes(self):
+        far = self.sd + timedelta(days=4000)
+        expected = CashFlow(self.sd, 100.00, self.ts).project(
+            horizon_days=4001).balanceOn(far)
+        self.assertEqual(self.cf.balanceOn(far), expected)
+        self.weekly.updateAmount(-2.00)
+        expected = CashFlow(self.sd, 100.00, self.ts).project(
+            horizon_days=4001).balanceOn(far)
+        self.assertEqual(self.cf.balanceOn(far), expected)
+
+    def test_before_start(self):
+        with self.assertRaises(ValueError):
+            self.cf.balanceOn(self.sd - timedelta(days=1))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,168 @@
+#!/bin/env python
+import unittest
+import os
+import tempfile
+from datetime import date
+import context
+from cash_flow.transaction import Transaction
+from cash_flow.transaction_store import TransactionStore
+from cash_flow.change_log import ChangeLog
+from cash_flow import yaml_codec
+from context import makeStore
+
+# Written by versions that dumped Transaction objects directly
+LEGACY_BOOK = """\
+- !!python/object:cash_flow.transaction.Transaction
+  amount: !!python/object:cash_flow.money.Money
+    value: !!python/object/apply:decimal.Decimal
+    - '12.50'
+  cleared: false
+  description: a
+  end: null
+  frequency: M
+  original_start: &id001 2021-01-15
+  scheduled: false
+  skip: !!set {}
+  start: *id001
+- !!python/object:cash_flow.transaction.Transaction
+  amount: !!python/object:cash_flow.money.Money
+    value: !!python/object/apply:decimal.Decimal
+    - '-3.00'
+  cleared: false
+  description: b
+  end: null
+  frequency: W
+  original_start: &id002 2021-01-20
+  scheduled: false
+  skip: !!set {}
+  start: *id002
+"""
+
+
+class TestChangeLog(unittest.TestCase):
+    def setUp(self):
+        self.sd = date(2021, 1, 29)
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'book.yml')
+        self.ts = makeStore(self.sd)
+        self.log = ChangeLog(self.ts, self.path)
+        self.log.save()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def reload(self):
+        ts = TransactionStore()
+        ChangeLog(ts, self.path).load()
+        return ts
+
+    def assertSameStore(self, ts):
+        self.assertEqual(
+            [yaml_codec.transactionToDict(t) for t in ts.getTransactions()],
+            [yaml_codec.transactionToDict(t)
+             for t in self.ts.getTransactions()])
+
+    def test_first_save_writes_snapshot(self):
+        self.assertTrue(os.path.exists(self.path))
+        self.assertEqual(self.log.logSize(), 0)
+        self.assertSameStore(self.reload())
+
+    def test_save_appends_one_record_per_changed_transaction(self):
+        snapshot = os.path.getmtime(self.path), os.path.getsize(self.path)
+        weekly = self.ts.getTransaction("Weekly")[0]
+        weekly.updateAmount(-2.00)
+        weekly.description = "Weekly, more"
+        new = Transaction(start=self.sd, description="New", amount=3.00)
+        self.ts.addTransactions(new)
+        self.ts.removeTransactions(self.ts.getTransaction("Once")[0])
+        self.log.save()
+        with open(self.log.log_path) as f:
+            # The generation, then the records
+            self.assertEqual(len(f.readlines()), 1 + 3)
+        self.assertEqual((os.path.getmtime(self.path),
+                          os.path.getsize(self.path)), snapshot)
+        self.assertSameStore(self.reload())
+        # Nothing new, nothing written
+        size = self.log.logSize()
+        self.log.save()
+        self.assertEqual(self.log.logSize(), size)
+
+    def test_compaction(self):
+        self.log.compact_bytes = 2000
+        weekly = self.ts.getTransaction("Weekly")[0]
+        for i in range(20):
+            weekly.updateAmount(-i)
+            self.log.save()
+            self.assertLessEqual(self.log.logSize(), 2000 + 1000)
+        self.assertSameStore(self.reload())
+        self.log.compact()
+        self.assertEqual(self.log.logSize(), 0)
+        self.assertSameStore(self.reload())
+
+    def test_load_replays_log_and_tracks_new_changes(self):
+        self.ts.getTransaction("Monthly")[0].end = None
+        self.log.save()
+        ts = TransactionStore()
+        log = ChangeLog(ts, self.path)
+        log.load()
+        self.assertEqual(log.pending, {})
+        self.assertSameStore(ts)
+        ts.getTransaction("Monthly")[0].updateAmount(-7.00)
+        self.assertEqual(len(log.pending), 1)
+
+    def test_truncated_record(self):
+        self.ts.getTransaction("Weekly")[0].updateAmount(-2.00)
+        self.log.save()
+        with open(self.log.log_path, "a") as f:
+            f.write('{"put":{"id":"x", "start":')
+        ts = TransactionStore()
+        ChangeLog(ts, self.path).load()
+        self.assertSameStore(ts)
+        self.assertFalse(os.path.exists(self.log.log_path))
+
+    def test_crash_between_snapshot_and_log_removal(self):
+        monthly = self.ts.getTransaction("Monthly")[0]
+        monthly.updateAmount(6.00)
+        self.log.save()
+        monthly.updateAmount(9.00)
+        remove = os.remove
+
+        def crash(path):
+            raise OSError("crashed")
+        os.remove = crash
+        try:
+            with self.assertRaises(OSError):
+                self.log.compact()
+        finally:
+            os.remove = remove
+        self.assertGreater(self.log.logSize(), 0)
+        ts = TransactionStore()
+        log = ChangeLog(ts, self.path)
+        log.load()
+        self.assertEqual(ts.getTransaction("Monthly")[0].amount, 9.00)
+        self.assertSameStore(ts)
+        # The stale log is replaced, not appended to
+        ts.getTransaction("Monthly")[0].updateAmount(4.00)
+        log.save()
+        self.assertEqual(self.reload().getTransaction("Monthly")[0].amount,
+                         4.00)
+
+    def test_legacy_book_is_saved_as_snapshot(self):
+        with open(self.path, "w") as f:
+            f.write(LEGACY_BOOK)
+        ts = TransactionStore()
+        log = ChangeLog(ts, self.path)
+        log.load()
+        self.assertTrue(log.needs_snapshot)
+        ts.getTransaction("a")[0].updateAmount(99.00)
+        log.save()
+        for _ in range(2):
+            ts = self.reload()
+            self.assertEqual(
+                [(t.description, str(t.amount))
+                 for t in ts.getTransactions()],
+                [('a', '99.00'), ('b', '-3.00')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+#!/bin/env python
+import unittest
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import date, timedelta
+import context
+from cash_flow.cash_flow import CashFlow
+from cash_flow.money import Money
+from cash_flow.export import exportProjection, JSONL
+from context import makeStore
+
+
+class TestExport(unittest.TestCase):
+    def setUp(self):
+        self.sd = date(2021, 1, 29)
+        self.cf = CashFlow(self.sd, 100.00, makeStore(self.sd))
+
+    def expected(self, horizon_days):
+        return [(d.isoformat(), str(balance),
+                 [(t.description, str(t.amount)) for t in transactions])
+                for (d, balance, transactions)
+                in self.cf.project(horizon_days=horizon_days)
+                .transactionDays()]
+
+    def test_csv_chunks_match_one_projection(self):
+        out = io.StringIO()
+        rows = exportProjection(self.cf, out, 1000, chunk_days=37)
+        lines = list(csv.reader(io.StringIO(out.getvalue())))
+        self.assertEqual(lines[0], ['date', 'balance', 'transactions'])
+        self.assertEqual(rows, len(lines) - 1)
+        expected = self.expected(1000)
+        self.assertEqual([line[:2] for line in lines[1:]],
+                         [list(row[:2]) for row in expected])
+        self.assertEqual(lines[1][2], '; '.join(
+            f"{d} {a}" for (d, a) in expected[0][2]))
+
+    def test_jsonl(self):
+        out = io.StringIO()
+        self.cf.exportProjection(out, 400, format=JSONL, chunk_days=30)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(
+            [(r['date'], r['balance'],
+              [(t['description'], t['amount']) for t in r['transactions']])
+             for r in records],
+            self.expected(400))
+
+    def test_every_day(self):
+        out = io.StringIO()
+        rows = exportProjection(self.cf, out, 100, format=JSONL,
+                                chunk_days=7, every_day=True)
+        self.assertEqual(rows, 100)
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        projection = self.cf.project(horizon_days=100)
+        for (index, record) in enumerate(records):
+            d = self.sd + timedelta(days=index)
+            self.assertEqual(record['date'], d.isoformat())
+            self.assertEqual(Money(record['balance']),
+                             projection.balanceOn(d))
+
+    def test_path_and_bad_format(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'projection.csv')
+            rows = exportProjection(self.cf, path, 200)
+            with open(path) as f:
+                self.assertEqual(len(f.readlines()), rows + 1)
+        with self.assertRaises(ValueError):
+            exportProjection(self.cf, io.StringIO(), 10, format='xml')
+
+
+if __name__ == '__main__':
+    unittest.main()
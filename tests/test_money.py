@@ -1,5 +1,7 @@
 #!/bin/env python
 import unittest
+import pickle
+import yaml
 from decimal import Decimal
 import context
 from cash_flow.money import Money
@@ -26,6 +28,34 @@ class TestConstructor(unittest.TestCase):
         self.assertIsInstance(m, Money)
         self.assertEqual(m.value, Decimal('1.54'))
 
+    def test_received_int(self):
+        m = Money(-3)
+        self.assertEqual(m.value, Decimal('-3.00'))
+        self.assertEqual(m.cents, -300)
+
+    def test_received_decimal(self):
+        m = Money(Decimal('2.125'))
+        self.assertEqual(m.value, Decimal('2.12'))
+
+    def test_received_bad_string(self):
+        with self.assertRaises(ValueError):
+            Money('one dollar')
+
+    def test_float_rounding(self):
+        # Rounded from the float's exact binary value, as it always was
+        self.assertEqual(Money(1.005).value, Decimal('1.00'))
+        self.assertEqual(Money(0.125).value, Decimal('0.12'))
+        self.assertEqual(Money(-7.555).value, Decimal('-7.55'))
+
+    def test_from_cents(self):
+        m = Money.fromCents(-1234)
+        self.assertIsInstance(m, Money)
+        self.assertEqual(m.value, Decimal('-12.34'))
+
+    def test_slots(self):
+        with self.assertRaises(AttributeError):
+            Money(1).other = 1
+
 
 class TestRepresentation(unittest.TestCase):
     def test_repr_no_decimals(self):
@@ -52,6 +82,21 @@ class TestRepresentation(unittest.TestCase):
         m = Money('1.23')
         self.assertEqual(str(m), "1.23")
 
+    def test_str_negative(self):
+        self.assertEqual(str(Money('-0.05')), "-0.05")
+        self.assertEqual(str(Money('-12')), "-12.00")
+
+    def test_pickle(self):
+        m = pickle.loads(pickle.dumps(Money('1.23')))
+        self.assertEqual(m, Money('1.23'))
+
+    def test_yaml_state(self):
+        doc = ("!!python/object:cash_flow.money.Money\n"
+               "value: !!python/object/apply:decimal.Decimal ['-2.50']\n")
+        m = yaml.load(doc, Loader=yaml.Loader)
+        self.assertEqual(m, Money('-2.50'))
+        self.assertEqual(yaml.load(yaml.dump(m), Loader=yaml.Loader), m)
+
 
 class TestAddition(unittest.TestCase):
     def test_add_money_and_money(self):
@@ -99,6 +144,35 @@ class TestSubtraction(unittest.TestCase):
         self.assertEqual(repr(m3), "1.25")
 
 
+class TestArithmetic(unittest.TestCase):
+    def test_negate(self):
+        self.assertEqual(repr(-Money(1.25)), "-1.25")
+
+    def test_multiply(self):
+        self.assertEqual(repr(Money(1.25) * 3), "3.75")
+        self.assertEqual(repr(3 * Money(1.25)), "3.75")
+        self.assertEqual(repr(Money(10.00) * 1.05), "10.50")
+        self.assertEqual(repr(Money(0.25) * Decimal('0.5')), "0.12")
+
+    def test_divide(self):
+        self.assertEqual(repr(Money(10.00) / 3), "3.33")
+        self.assertEqual(Money(10.00) / Money(4.00), Decimal('2.5'))
+
+    def test_sum(self):
+        self.assertEqual(repr(sum([Money(1.25), Money(2.50)])), "3.75")
+
+
+class TestHash(unittest.TestCase):
+    def test_hash_matches_equal_numbers(self):
+        self.assertEqual(hash(Money(1.25)), hash(1.25))
+        self.assertEqual(hash(Money(1.25)), hash(Decimal('1.25')))
+        self.assertEqual(hash(Money(3)), hash(3))
+        self.assertEqual(hash(Money(1.54)), hash(Decimal('1.54')))
+
+    def test_usable_in_set(self):
+        self.assertEqual(len(set([Money(1.25), Money('1.25')])), 1)
+
+
 class TestEquality(unittest.TestCase):
     def test_money_eq_money(self):
         m1 = Money(1.25)
@@ -0,0 +1,99 @@
+#!/bin/env python
+import unittest
+import numpy as np
+import context
+from cash_flow.money import Money
+from cash_flow.money_array import MoneyArray
+
+
+class TestConstructor(unittest.TestCase):
+    def test_empty_constructor(self):
+        a = MoneyArray()
+        self.assertEqual(len(a), 0)
+        self.assertEqual(a.cents.dtype, np.int64)
+
+    def test_from_money_list(self):
+        a = MoneyArray([Money(1.25), 2, '-0.50', 0.01])
+        self.assertEqual(a.cents.tolist(), [125, 200, -50, 1])
+
+    def test_from_cents_shares_array(self):
+        cents = np.array([1, 2, 3], dtype=np.int64)
+        a = MoneyArray.fromCents(cents)
+        self.assertIs(a.cents, cents)
+
+    def test_to_list(self):
+        ms = [Money(1.25), Money(-3.00)]
+        a = MoneyArray(ms)
+        self.assertEqual(a.toList(), ms)
+        self.assertTrue(all(type(m) is Money for m in a.toList()))
+        self.assertEqual(list(a), ms)
+
+    def test_repr(self):
+        self.assertEqual(repr(MoneyArray([1, '2.5'])),
+                         "MoneyArray([1.00, 2.50])")
+
+
+class TestIndexing(unittest.TestCase):
+    def setUp(self):
+        self.a = MoneyArray([1, 2, 3, 4])
+
+    def test_single_element(self):
+        self.assertIsInstance(self.a[1], Money)
+        self.assertEqual(self.a[-1], Money(4))
+
+    def test_slice(self):
+        s = self.a[1:3]
+        self.assertIsInstance(s, MoneyArray)
+        self.assertEqual(s.toList(), [Money(2), Money(3)])
+
+
+class TestArithmetic(unittest.TestCase):
+    def setUp(self):
+        self.a = MoneyArray([1.25, 2.50, -1.00])
+        self.b = MoneyArray([0.25, 0.50, 1.00])
+
+    def test_add_arrays(self):
+        self.assertEqual((self.a + self.b).cents.tolist(), [150, 300, 0])
+
+    def test_add_scalar(self):
+        self.assertEqual((self.a + Money(1)).cents.tolist(),
+                         [225, 350, 0])
+        self.assertEqual((1 + self.a).cents.tolist(), [225, 350, 0])
+
+    def test_subtract(self):
+        self.assertEqual((self.a - self.b).cents.tolist(), [100, 200, -200])
+        self.assertEqual((0 - self.a).cents.tolist(), [-125, -250, 100])
+
+    def test_negate(self):
+        self.assertEqual((-self.a).cents.tolist(), [-125, -250, 100])
+
+    def test_cumsum(self):
+        self.assertEqual(self.a.cumsum().cents.tolist(), [125, 375, 275])
+
+    def test_reductions(self):
+        self.assertEqual(self.a.sum(), Money(2.75))
+        self.assertEqual(self.a.min(), Money(-1))
+        self.assertEqual(self.a.max(), Money(2.5))
+
+
+class TestComparison(unittest.TestCase):
+    def setUp(self):
+        self.a = MoneyArray([99.99, 100.00, 100.01])
+
+    def test_compare_to_money(self):
+        self.assertEqual((self.a < Money(100)).tolist(),
+                         [True, False, False])
+        self.assertEqual((self.a >= Money(100)).tolist(),
+                         [False, True, True])
+
+    def test_compare_to_number(self):
+        self.assertEqual((self.a == 100.00).tolist(), [False, True, False])
+        self.assertEqual((self.a > '100').tolist(), [False, False, True])
+
+    def test_compare_to_array(self):
+        other = MoneyArray([100, 100, 100])
+        self.assertEqual((self.a <= other).tolist(), [True, True, False])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+#!/bin/env python
+import unittest
+import numpy as np
+from datetime import date, timedelta
+import context
+from cash_flow.transaction import Transaction
+from cash_flow.transaction_store import TransactionStore
+from cash_flow.cash_flow import CashFlow
+from cash_flow.money import Money
+from cash_flow.monte_carlo import monteCarlo
+
+
+class TestMonteCarlo(unittest.TestCase):
+    def setUp(self):
+        self.sd = date(2021, 1, 29)
+        self.rent = Transaction(start=self.sd+timedelta(days=2),
+                                description="Rent", amount=-1000.00,
+                                frequency=Transaction.MONTHLY)
+        self.pay = Transaction(start=self.sd, description="Pay",
+                               amount=600.00,
+                               frequency=Transaction.BIWEEKLY)
+        self.power = Transaction(start=self.sd+timedelta(days=10),
+                                 description="Power", amount=-80.00,
+                                 frequency=Transaction.MONTHLY)
+        self.ts = TransactionStore()
+        self.ts.addTransactions(self.rent, self.pay, self.power)
+        self.cf = CashFlow(self.sd, 500.00, self.ts)
+
+    def test_no_uncertainty_matches_projection(self):
+        projection = self.cf.project(horizon_days=120)
+        result = monteCarlo(projection, trials=20, seed=1, workers=1,
+                            batch_size=7)
+        for p in (5, 50, 95):
+            self.assertTrue(np.array_equal(result.percentiles[p],
+                                           projection.balances))
+        self.assertTrue(np.array_equal(result.below_zero,
+                                       projection.balances < 0))
+        self.assertEqual(result.trials, 20)
+
+    def test_seeded_and_independent_of_workers(self):
+        self.power.amount_stddev = Money(25.00)
+        self.pay.date_jitter = 2
+        one = self.cf.monteCarlo(trials=1200, seed=42, workers=1,
+                                 horizon_days=90)
+        two = self.cf.monteCarlo(trials=1200, seed=42, workers=2,
+                                 horizon_days=90)
+        for p in one.percentiles:
+            self.assertTrue(np.array_equal(one.percentiles[p],
+                                           two.percentiles[p]))
+        self.assertTrue(np.array_equal(one.below_warning,
+                                       two.below_warning))
+        self.assertEqual(one.ever_below_zero, two.ever_below_zero)
+        other = self.cf.monteCarlo(trials=1200, seed=43, workers=1,
+                                   horizon_days=90)
+        self.assertFalse(np.array_equal(one.percentiles[50],
+                                        other.percentiles[50]))
+
+    def test_spread_and_probabilities(self):
+        self.power.amount_stddev = Money(25.00)
+        self.rent.date_jitter = 3
+        projection = self.cf.project(horizon_days=90)
+        result = monteCarlo(projection, trials=2000, seed=7, workers=1)
+        self.assertTrue(np.all(result.percentiles[5] <=
+                               result.percentiles[50]))
+        self.assertTrue(np.all(result.percentiles[50] <=
+                               result.percentiles[95]))
+        self.assertTrue(np.all(result.below_zero <= result.below_warning))
+        self.assertTrue(0 <= result.ever_below_zero <=
+                        result.ever_below_warning <= 1)
+        # Rent is due on day 2 but lands on day 0 or earlier in 2 of 7
+        # trials, and those count on day 0
+        self.assertEqual(result.percentiles[5][0],
+                         projection.balances[0] - 100000)
+        self.assertEqual(result.percentiles[95][0], projection.balances[0])
+        # Amounts spread evenly around the projection
+        self.assertLess(abs(result.percentiles[50][80] -
+                            projection.balances[80]), 2000)
+
+    def test_uncertainty_survives_duplicate(self):
+        self.power.amount_stddev = Money(12.34)
+        self.power.date_jitter = 4
+        copy = self.power.duplicate()
+        self.assertEqual(copy.amount_stddev, 12.34)
+        self.assertEqual(copy.date_jitter, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
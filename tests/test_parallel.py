@@ -0,0 +1,61 @@
+#!/bin/env python
+import unittest
+import random
+import numpy as np
+from datetime import date, timedelta
+import context
+from cash_flow.transaction import Transaction
+from cash_flow.transaction_store import TransactionStore
+from cash_flow.cash_flow import CashFlow
+from cash_flow.parallel import projectBalances, _pack, _unpack
+from context import makeStore
+
+
+class TestParallelProjection(unittest.TestCase):
+    def setUp(self):
+        self.sd = date(2021, 1, 29)
+        self.ts = makeStore(self.sd)
+        rng = random.Random(3)
+        frequencies = [Transaction.ONCE, Transaction.WEEKLY,
+                       Transaction.BIWEEKLY, Transaction.MONTHLY,
+                       Transaction.QUARTERLY, Transaction.ANNUALLY]
+        for i in range(200):
+            start = self.sd + timedelta(days=rng.randint(-400, 400))
+            end = None
+            if rng.random() < 0.3:
+                end = start + timedelta(days=rng.randint(0, 500))
+            self.ts.addTransactions(Transaction(
+                start=start, end=end, description=f"T{i}",
+                amount=rng.randint(-50000, 50000) / 100,
+                frequency=rng.choice(frequencies),
+                skip=set([start + timedelta(days=rng.randint(0, 60))])))
+        self.cf = CashFlow(self.sd, 1234.56, self.ts)
+
+    def test_matches_serial(self):
+        serial = self.cf.project(horizon_days=730).balances
+        for (workers, shard_size) in ((1, 1000), (1, 7), (2, 50)):
+            balances = self.cf.projectBalances(horizon_days=730,
+                                               workers=workers,
+                                               shard_size=shard_size)
+            self.assertEqual(balances.dtype, np.int64)
+            self.assertTrue(np.array_equal(balances, serial))
+
+    def test_other_start(self):
+        start = self.sd + timedelta(days=45)
+        self.assertTrue(np.array_equal(
+            projectBalances(self.ts, start, 10.00, 100, workers=1,
+                            shard_size=30),
+            CashFlow(start, 10.00, self.ts).project(
+                horizon_days=100).balances))
+
+    def test_empty_store(self):
+        balances = projectBalances(TransactionStore(), self.sd, 5.00, 10)
+        self.assertTrue(np.array_equal(balances, np.full(10, 500)))
+
+    def test_pack_round_trip(self):
+        for t in self.ts.store.values():
+            self.assertEqual(_pack(_unpack(_pack(t))), _pack(t))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,210 @@
+#!/bin/env python
+import unittest
+import random
+import numpy as np
+from datetime import date, timedelta
+import context
+from cash_flow.transaction import Transaction
+from cash_flow.transaction_store import TransactionStore
+from cash_flow.cash_flow import CashFlow
+from cash_flow.money import Money
+from cash_flow.projection import occurrenceDays
+from context import makeStore
+
+
+class TestProject(unittest.TestCase):
+    def setUp(self):
+        self.sd = date(2021, 1, 29)
+        self.ts = makeStore(self.sd)
+        self.cf = CashFlow(self.sd, 100.00, self.ts)
+
+    def test_matches_generator(self):
+        p = self.cf.project(horizon_days=400)
+        day = CashFlow(self.sd, 100.00, self.ts).getTodaysTransactions()
+        for i in range(400):
+            (d, bal, t_list) = next(day)
+            self.assertEqual(p.days[i], np.datetime64(d))
+            self.assertEqual(p.balanceOn(d), bal)
+            self.assertEqual(p.transactionsOn(d), t_list)
+
+    def test_arrays(self):
+        p = self.cf.project(horizon_days=30)
+        self.assertEqual(len(p), 30)
+        self.assertEqual(p.days.dtype, np.dtype('datetime64[D]'))
+        self.assertEqual(p.deltas.dtype, np.int64)
+        self.assertEqual(p.balances[0], 10000 + p.deltas[0])
+        self.assertTrue(np.array_equal(np.cumsum(p.deltas) + 10000,
+                                       p.balances))
+        self.assertTrue(np.all(np.diff(p.occurrences['day']) >= 0))
+        self.assertNotIn(self.ts.getTransaction("Zero")[0],
+                         [p.transactions[i]
+                          for i in p.occurrences['transaction']])
+
+    def test_other_start(self):
+        start = self.sd + timedelta(days=45)
+        p = self.cf.project(start, 10)
+        self.assertEqual(p.days[0], np.datetime64(start))
+        with self.assertRaises(IndexError):
+            p.balanceOn(self.sd)
+
+    def test_empty_store(self):
+        p = CashFlow(self.sd, 1.00, TransactionStore()).project()
+        self.assertEqual(len(p.occurrences), 0)
+        self.assertEqual(p.balanceOn(self.sd), Money(1.00))
+
+    def test_month_schedules_match_walk(self):
+        # Month ends clamp and never spring back, over leap years too
+        starts = [date(2020, 2, 29), date(2021, 1, 31), date(2021, 3, 30),
+                  date(2020, 8, 31), date(2021, 1, 15), date(2019, 5, 29)]
+        for start in starts:
+            for frequency in Transaction.PERIOD_MONTHS:
+                for end in (None, start + timedelta(days=700)):
+                    t = Transaction(start=start, end=end, amount=1.00,
+                                    frequency=frequency)
+                    for offset in (-400, 0, 45, 1000):
+                        first = start + timedelta(days=offset)
+                        last = first + timedelta(days=365 * 9 - 1)
+                        self.assertEqual(
+                            list(occurrenceDays(t, first, 365 * 9)),
+                            [(d - first).days for (d, _)
+                             in t.occurrencesBetween(first, last)])
+
+
+class TestGoalSeek(unittest.TestCase):
+    def setUp(self):
+        self.sd = date(2021, 1, 29)
+        self.ts = makeStore(self.sd)
+        self.p = CashFlow(self.sd, 100.00, self.ts).project()
+
+    def lowest(self, start_balance):
+        return CashFlow(self.sd, start_balance,
+                        self.ts).project().lowestBalance()[1]
+
+    def test_minimum_start_balance(self):
+        for warning in (0, 100.00, 37.45, -20.00):
+            balance = self.p.minimumStartBalance(warning)
+            self.assertEqual(self.lowest(balance), warning)
+            self.assertLess(self.lowest(balance - 0.01), warning)
+
+    def test_minimum_deposit(self):
+        warning = Money(93.00)
+        d = self.sd + timedelta(days=3)
+        self.assertLess(self.p.lowestBalance(first=d)[1], warning)
+        self.assertGreaterEqual(self.p.lowestBalance(
+            last=d - timedelta(days=1))[1], warning)
+        deposit = self.p.minimumDeposit(d, warning)
+        self.ts.addTransactions(Transaction(start=d, description="Deposit",
+                                            amount=deposit))
+        self.assertEqual(self.lowest(100.00), warning)
+        self.ts.getTransaction("Deposit")[0].amount = deposit - 0.01
+        self.assertLess(self.lowest(100.00), warning)
+
+    def test_deposit_too_late_or_unneeded(self):
+        self.assertIsNone(self.p.minimumDeposit(
+            self.sd + timedelta(days=300), 120.00))
+        self.assertEqual(self.p.minimumDeposit(self.sd, -1000.00), 0)
+        self.assertEqual(self.p.minimumDeposit(self.sd, 120.00),
+                         self.p.minimumStartBalance(120.00) - 100.00)
+
+
+class TestIncremental(unittest.TestCase):
+    def setUp(self):
+        self.sd = date(2021, 1, 29)
+        self.ts = makeStore(self.sd)
+        self.cf = CashFlow(self.sd, 100.00, self.ts)
+        self.p = self.cf.project(horizon_days=400)
+
+    def assertMatchesRebuild(self, p):
+        fresh = self.cf.project(horizon_days=400)
+        self.assertTrue(np.array_equal(p.deltas, fresh.deltas))
+        self.assertTrue(np.array_equal(p.balances, fresh.balances))
+        self.assertEqual(list(p.transactionDays()),
+                         list(fresh.transactionDays()))
+
+    def test_modify_amount(self):
+        t = self.ts.getTransaction("Monthly")[0]
+        t.updateAmount(-30.00)
+        self.p.updateTransaction(t)
+        self.assertMatchesRebuild(self.p)
+
+    def test_add_and_remove(self):
+        t = Transaction(start=self.sd+timedelta(days=100),
+                        description="New", amount=-7.77,
+                        frequency=Transaction.BIWEEKLY)
+        self.ts.addTransactions(t)
+        self.p.updateTransaction(t)
+        self.assertMatchesRebuild(self.p)
+        weekly = self.ts.getTransaction("Weekly")[0]
+        self.ts.removeTransactions(weekly)
+        self.p.removeTransaction(weekly)
+        self.assertMatchesRebuild(self.p)
+
+    def test_only_later_balances_change(self):
+        before = self.p.balances.copy()
+        t = Transaction(start=self.sd+timedelta(days=200),
+                        description="Late", amount=1.00)
+        self.p.updateTransaction(t)
+        self.assertTrue(np.array_equal(self.p.balances[:200],
+                                       before[:200]))
+        self.assertTrue(np.array_equal(self.p.balances[200:],
+                                       before[200:] + 100))
+
+    def test_sync_with_store(self):
+        rng = random.Random(4)
+        for i in range(30):
+            transactions = self.ts.getTransactions()
+            t = rng.choice(transactions)
+            action = rng.randrange(4)
+            if action == 0:
+                t.updateAmount(rng.randint(-5000, 5000) / 100)
+            elif action == 1:
+                t.start += timedelta(days=rng.randint(-20, 20))
+            elif action == 2:
+                self.ts.removeTransactions(t)
+            else:
+                self.ts.addTransactions(t.duplicate())
+            if i % 3 == 0:
+                self.p.sync(self.ts)
+                self.assertEqual(self.p.version, self.ts.version)
+                self.assertMatchesRebuild(self.p)
+
+    def test_sync_past_journal(self):
+        ts = TransactionStore(journal_length=2)
+        ts.addTransactionsFrom(self.ts.getTransactions())
+        cf = CashFlow(self.sd, 100.00, ts)
+        p = cf.project(horizon_days=400)
+        for t in ts.getTransactions():
+            t.updateAmount(t.amount + 1)
+        p.sync(ts)
+        self.assertMatchesRebuild(p)
+
+    def assertLowest(self, lo, hi):
+        window = self.p.balances[lo:hi + 1]
+        index = lo + int(np.argmin(window))
+        self.assertEqual(self.p.lowestBalance(self.sd+timedelta(days=lo),
+                                              self.sd+timedelta(days=hi)),
+                         (self.sd+timedelta(days=index),
+                          Money.fromCents(window.min())))
+
+    def test_lowest_balance_follows_changes(self):
+        (d, low) = self.p.lowestBalance()
+        self.assertEqual(low, Money.fromCents(self.p.balances.min()))
+        self.assertEqual(self.p.balanceOn(d), low)
+        t = Transaction(start=self.sd+timedelta(days=300),
+                        description="Big bill", amount=-10000.00)
+        self.p.updateTransaction(t)
+        self.assertLowest(0, 399)
+        self.assertLowest(0, 99)
+        self.assertLowest(250, 320)
+        self.p.setStartBalance(20000.00)
+        self.assertLowest(0, 399)
+        self.assertLowest(280, 300)
+
+    def test_start_balance(self):
+        self.p.setStartBalance(50.00)
+        self.assertEqual(self.p.balances[0], 5000 + self.p.deltas[0])
+        self.assertEqual(self.p.start_balance, Money(50.00))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+#!/bin/env python
+import unittest
+import gc
+import numpy as np
+from datetime import date, timedelta
+import context
+from cash_flow.transaction import Transaction
+from cash_flow.cash_flow import CashFlow
+from cash_flow.projection_cache import ProjectionCache
+from context import makeStore
+
+
+class TestProjectionCache(unittest.TestCase):
+    def setUp(self):
+        self.sd = date(2021, 1, 29)
+        self.ts = makeStore(self.sd)
+        self.cf = CashFlow(self.sd, 100.00, self.ts)
+        self.cache = ProjectionCache()
+
+    def test_hit_shares_frozen_projection(self):
+        first = self.cache.project(self.cf)
+        second = self.cache.project(self.cf)
+        self.assertIs(first, second)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertTrue(np.array_equal(first.balances,
+                                       self.cf.project().balances))
+        with self.assertRaises(ValueError):
+            first.balances[0] = 0
+        with self.assertRaises(ValueError):
+            first.setStartBalance(5.00)
+        with self.assertRaises(ValueError):
+            first.sync(self.ts)
+        with self.assertRaises(ValueError):
+            first.occurrences['amount'][:] = 0
+        # The table is built before the size is taken
+        size = first.nbytes
+        list(first.transactionDays())
+        self.assertEqual(first.nbytes, size)
+        self.assertEqual(self.cache.nbytes, size)
+        # Reading still works on a frozen projection
+        first.lowestBalance()
+        list(first.transactionDays())
+
+    def test_key_parameters(self):
+        base = self.cache.project(self.cf)
+        self.assertIsNot(self.cache.project(self.cf, horizon_days=30), base)
+        self.assertIsNot(self.cache.project(
+            self.cf, start=self.sd + timedelta(days=1)), base)
+        self.cf.start_balance = self.cf.start_balance + 1
+        self.assertIsNot(self.cache.project(self.cf), base)
+        self.assertEqual(self.cache.misses, 4)
+        self.assertEqual(len(self.cache), 4)
+
+    def test_store_change_invalidates(self):
+        before = self.cache.project(self.cf)
+        other = CashFlow(self.sd, 100.00, makeStore(self.sd))
+        kept = self.cache.project(other)
+        self.ts.addTransactions(Transaction(start=self.sd, description="New",
+                                            amount=-1.00))
+        # Only the changed store's entries go
+        self.assertEqual(len(self.cache), 1)
+        after = self.cache.project(self.cf)
+        self.assertIsNot(after, before)
+        self.assertEqual(after.balances[0], before.balances[0] - 100)
+        self.assertIs(self.cache.project(other), kept)
+
+    def test_memory_budget_evicts_least_recently_used(self):
+        size = self.cf.project().nbytes
+        cache = ProjectionCache(max_bytes=int(size * 2.5))
+        a = cache.project(self.cf, horizon_days=365)
+        cache.project(self.cf, horizon_days=364)
+        cache.project(self.cf, horizon_days=365)
+        cache.project(self.cf, horizon_days=363)
+        self.assertEqual(cache.evictions, 1)
+        self.assertLessEqual(cache.nbytes, cache.max_bytes)
+        self.assertIs(cache.project(self.cf, horizon_days=365), a)
+        cache.project(self.cf, horizon_days=364)
+        self.assertEqual(cache.misses, 4)
+        # Too big to keep at all
+        tiny = ProjectionCache(max_bytes=10)
+        tiny.project(self.cf)
+        self.assertEqual((len(tiny), tiny.nbytes), (0, 0))
+
+    def test_collected_store_is_forgotten(self):
+        cf = CashFlow(self.sd, 100.00, makeStore(self.sd))
+        self.cache.project(cf)
+        # Cached projections keep their store alive
+        self.cache.clear()
+        del cf
+        gc.collect()
+        self.assertEqual(self.cache._stores, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
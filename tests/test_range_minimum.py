@@ -0,0 +1,56 @@
+#!/bin/env python
+import unittest
+import random
+import numpy as np
+import context
+from cash_flow.range_minimum import RangeMinimum
+
+
+class TestRangeMinimum(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.values = np.array([rng.randint(-50, 50) for i in range(300)],
+                               dtype=np.int64)
+        self.rmq = RangeMinimum(self.values)
+        self.rng = rng
+
+    def assertAllQueries(self, count=2000):
+        for i in range(count):
+            lo = self.rng.randrange(len(self.values))
+            hi = self.rng.randrange(lo, len(self.values))
+            window = self.values[lo:hi + 1]
+            expected = (window.min(), lo + int(np.argmin(window)))
+            self.assertEqual(self.rmq.query(lo, hi), expected)
+
+    def test_queries(self):
+        self.assertAllQueries()
+
+    def test_single_element(self):
+        self.assertEqual(self.rmq.query(5, 5), (self.values[5], 5))
+
+    def test_ties_pick_earliest(self):
+        rmq = RangeMinimum(np.array([3, 1, 2, 1, 1]))
+        self.assertEqual(rmq.query(0, 4), (1, 1))
+        self.assertEqual(rmq.query(2, 4), (1, 3))
+
+    def test_update_suffix(self):
+        for first in [250, 0, 137, 299]:
+            self.values[first:] += self.rng.randint(-80, 80)
+            self.values[first] = self.rng.randint(-200, 200)
+            self.rmq.update(first)
+            self.assertAllQueries(500)
+
+    def test_bad_range(self):
+        with self.assertRaises(IndexError):
+            self.rmq.query(10, 5)
+        with self.assertRaises(IndexError):
+            self.rmq.query(0, 300)
+
+    def test_empty(self):
+        rmq = RangeMinimum(np.zeros(0, dtype=np.int64))
+        with self.assertRaises(IndexError):
+            rmq.query(0, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+#!/bin/env python
+import unittest
+from datetime import date, timedelta
+import context
+from cash_flow.transaction_store import TransactionStore
+from cash_flow.cash_flow import CashFlow
+from cash_flow.money import Money
+from cash_flow.rollup import rollup, WEEK, MONTH, QUARTER, YEAR
+from context import makeStore
+
+
+class TestRollup(unittest.TestCase):
+    def setUp(self):
+        self.sd = date(2021, 1, 29)
+        self.ts = makeStore(self.sd)
+        self.p = CashFlow(self.sd, 100.00, self.ts).project(horizon_days=800)
+
+    def byHand(self, key):
+        # Brute force over the generator-style day list
+        buckets = {}
+        balance = self.p.start_balance
+        for i in range(len(self.p)):
+            d = self.sd + timedelta(days=i)
+            bucket = buckets.setdefault(key(d), {
+                'start': d, 'in': Money(0), 'out': Money(0),
+                'min': None})
+            for t in self.p.transactionsOn(d):
+                if t.amount > 0:
+                    bucket['in'] += t.amount
+                else:
+                    bucket['out'] += t.amount
+            balance = self.p.balanceOn(d)
+            bucket['end'] = balance
+            if bucket['min'] is None or balance < bucket['min']:
+                bucket['min'] = balance
+        previous = self.p.start_balance
+        rows = []
+        for bucket in buckets.values():
+            rows.append((bucket['start'], bucket['in'], bucket['out'],
+                         bucket['end'] - previous, bucket['end'],
+                         bucket['min']))
+            previous = bucket['end']
+        return rows
+
+    def test_periods(self):
+        keys = {WEEK: lambda d: d.isocalendar()[:2],
+                MONTH: lambda d: (d.year, d.month),
+                QUARTER: lambda d: (d.year, (d.month - 1) // 3),
+                YEAR: lambda d: d.year}
+        for (period, key) in keys.items():
+            self.assertEqual(list(rollup(self.p, period).rows()),
+                             self.byHand(key), period)
+
+    def test_custom_buckets(self):
+        starts = [self.sd + timedelta(days=100), self.sd + timedelta(days=10)]
+        r = rollup(self.p, starts)
+        self.assertEqual(len(r), 3)
+        self.assertEqual(list(r.rows()), self.byHand(
+            lambda d: sum(d >= s for s in starts)))
+
+    def test_totals(self):
+        r = rollup(self.p, MONTH)
+        self.assertEqual(r.net.sum(), self.p.deltas.sum())
+        self.assertEqual(r.ending[-1], self.p.balances[-1])
+        self.assertEqual((r.inflow + r.outflow).tolist(), r.net.tolist())
+
+    def test_empty_and_bad_period(self):
+        cf = CashFlow(self.sd, 1.00, TransactionStore())
+        r = rollup(cf.project(horizon_days=40), MONTH)
+        self.assertEqual(r.ending.tolist(), [100, 100, 100])
+        self.assertEqual(r.inflow.tolist(), [0, 0, 0])
+        with self.assertRaises(ValueError):
+            rollup(cf.project(), 'fortnight')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/bin/env python
+import unittest
+import numpy as np
+from datetime import date, timedelta
+import context
+from cash_flow.transaction import Transaction
+from cash_flow.transaction_store import TransactionStore
+from cash_flow.cash_flow import CashFlow
+from cash_flow.scenario import Scenario, evaluateScenarios
+
+
+class TestScenarios(unittest.TestCase):
+    def setUp(self):
+        self.sd = date(2021, 1, 29)
+        self.rent = Transaction(start=self.sd+timedelta(days=2),
+                                description="Rent", amount=-1000.00,
+                                frequency=Transaction.MONTHLY)
+        self.pay = Transaction(start=self.sd, description="Pay",
+                               amount=1250.55,
+                               frequency=Transaction.BIWEEKLY)
+        self.sub = Transaction(start=self.sd+timedelta(days=10),
+                               description="Subscription", amount=-9.99,
+                               frequency=Transaction.MONTHLY)
+        self.ts = TransactionStore()
+        self.ts.addTransactions(self.rent, self.pay, self.sub)
+        self.cf = CashFlow(self.sd, 500.00, self.ts)
+
+    def rebuilt(self, start_balance=500.00):
+        # Brute force: apply the same change to a copy of the store
+        return CashFlow(self.sd, start_balance,
+                        self.ts).project(horizon_days=365).balances
+
+    def test_base_scenario(self):
+        result = self.cf.projectScenarios([Scenario()])
+        self.assertEqual(result.shape, (1, 365))
+        self.assertTrue(np.array_equal(result[0], self.rebuilt()))
+
+    def test_overrides_match_rebuilt_stores(self):
+        first_rent = self.sd + timedelta(days=2)
+        scenarios = [Scenario("rent up", scales={self.rent: 1.05}),
+                     Scenario("cancel", exclude=[self.sub]),
+                     Scenario("lower balance", start_balance=0.00),
+                     Scenario("only pay", include=[self.pay.id]),
+                     Scenario("skip rent", skip={self.rent: [first_rent]})]
+        result = self.cf.projectScenarios(scenarios)
+        self.assertEqual(result.shape, (5, 365))
+
+        self.rent.updateAmount(-1050.00)
+        self.assertTrue(np.array_equal(result[0], self.rebuilt()))
+        self.rent.updateAmount(-1000.00)
+
+        self.ts.removeTransactions(self.sub)
+        self.assertTrue(np.array_equal(result[1], self.rebuilt()))
+        self.ts.addTransactions(self.sub)
+
+        self.assertTrue(np.array_equal(result[2], self.rebuilt(0.00)))
+
+        self.ts.removeTransactions(self.rent, self.sub)
+        self.assertTrue(np.array_equal(result[3], self.rebuilt()))
+        self.ts.addTransactions(self.rent, self.sub)
+
+        self.rent.skip.add(first_rent)
+        self.assertTrue(np.array_equal(result[4], self.rebuilt()))
+
+    def test_shared_schedule(self):
+        p = self.cf.project(horizon_days=100)
+        scenarios = [Scenario(start_balance=b) for b in range(10)]
+        result = evaluateScenarios(p, scenarios)
+        for b in range(10):
+            self.assertTrue(np.array_equal(result[b],
+                                           p.balances - 50000 + b * 100))
+
+    def test_empty_store(self):
+        cf = CashFlow(self.sd, 1.00, TransactionStore())
+        result = cf.projectScenarios([Scenario(), Scenario(start_balance=2)],
+                                     horizon_days=3)
+        self.assertEqual(result.tolist(), [[100, 100, 100],
+                                           [200, 200, 200]])
+
+
+if __name__ == '__main__':
+    unittest.main()
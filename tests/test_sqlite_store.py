@@ -0,0 +1,151 @@
+#!/bin/env python
+import unittest
+import os
+import tempfile
+import numpy as np
+from datetime import date, timedelta
+import context
+from cash_flow.transaction import Transaction
+from cash_flow.transaction_store import TransactionStore
+from cash_flow.sqlite_store import SQLiteTransactionStore
+from cash_flow.cash_flow import CashFlow
+from context import makeStore
+
+
+class TestSQLiteStore(unittest.TestCase):
+    def setUp(self):
+        self.sd = date(2021, 1, 29)
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'book.sqlite')
+        self.memory = makeStore(self.sd)
+        self.ts = SQLiteTransactionStore(self.path)
+        self.ts.addTransactionsFrom(self.memory.getTransactions())
+
+    def tearDown(self):
+        self.ts.close()
+        self.directory.cleanup()
+
+    def reopen(self):
+        self.ts.close()
+        self.ts = SQLiteTransactionStore(self.path)
+
+    def ids(self, transactions):
+        return [t.id for t in transactions]
+
+    def test_round_trip(self):
+        self.reopen()
+        self.assertEqual(len(self.ts), len(self.memory.store))
+        for t in self.memory.getTransactions():
+            loaded = self.ts.getTransactionById(t.id)
+            self.assertIsNot(loaded, t)
+            for field in ('start', 'original_start', 'end', 'description',
+                          'amount', 'frequency', 'skip', 'scheduled',
+                          'cleared', 'amount_stddev', 'date_jitter'):
+                self.assertEqual(getattr(loaded, field),
+                                 getattr(t, field), field)
+
+    def test_queries_match_memory_store(self):
+        self.reopen()
+        self.assertEqual(self.ids(self.ts.getTransactions()),
+                         self.ids(self.memory.getTransactions()))
+        self.assertEqual(
+            self.ids(self.ts.getTransactions(Transaction.WEEKLY)),
+            self.ids(self.memory.getTransactions(Transaction.WEEKLY)))
+        for i in range(-50, 400, 7):
+            d = self.sd + timedelta(days=i)
+            self.assertEqual(
+                self.ids(self.ts.getActiveTransactions(d, d + timedelta(3))),
+                self.ids(self.memory.getActiveTransactions(
+                    d, d + timedelta(3))))
+            self.assertEqual(
+                self.ids(self.ts.getTransaction("Monthly", d)),
+                self.ids(self.memory.getTransaction("Monthly", d)))
+
+    def test_identity_and_edits(self):
+        self.reopen()
+        t = self.ts.getTransaction("Weekly")[0]
+        self.assertIs(self.ts.getTransactionById(t.id), t)
+        version = self.ts.version
+        t.description = "Renamed"
+        t.start = self.sd + timedelta(days=100)
+        self.assertEqual(self.ts.version, version + 2)
+        # Queries see edits before they're saved
+        self.assertEqual(self.ts.getTransaction("Weekly"), [])
+        self.assertEqual(self.ts.getTransaction("Renamed"), [t])
+        self.assertNotIn(t, self.ts.getActiveTransactions(
+            self.sd, self.sd + timedelta(days=50)))
+        self.reopen()
+        self.assertEqual(
+            self.ts.getTransactionById(t.id).start,
+            self.sd + timedelta(days=100))
+
+    def test_only_edited_rows_are_written(self):
+        self.reopen()
+        transactions = self.ts.getTransactions()
+        transactions[0].amount = 99.00
+        statements = []
+        self.ts.db.set_trace_callback(statements.append)
+        self.ts.saveTransactions()
+        self.ts.db.set_trace_callback(None)
+        self.assertEqual(len([s for s in statements
+                              if s.startswith("UPDATE")]), 1)
+
+    def test_add_remove_and_journal(self):
+        t = Transaction(start=self.sd, description="New", amount=1.00)
+        version = self.ts.version
+        self.ts.addTransactions(t)
+        self.ts.addTransactions(t)
+        self.ts.removeTransactions(t, t)
+        self.assertEqual([(c.kind, c.transaction_id)
+                          for c in self.ts.changesSince(version)],
+                         [(TransactionStore.ADDED, t.id),
+                          (TransactionStore.MODIFIED, t.id),
+                          (TransactionStore.REMOVED, t.id)])
+        self.assertFalse(self.ts.hasTransaction(t))
+        # Removed transactions are no longer watched
+        t.amount = 5.00
+        self.assertEqual(self.ts.version, version + 3)
+
+    def test_purge_and_update_start_dates(self):
+        for store in (self.memory, self.ts):
+            store.purgeSingleBefore(self.sd + timedelta(days=1))
+            store.updateRecurringStartDates(self.sd + timedelta(days=30))
+        self.reopen()
+        self.assertEqual(
+            [(t.id, t.start) for t in self.ts.getTransactions()],
+            [(t.id, t.start) for t in self.memory.getTransactions()])
+
+    def test_projection_and_sync(self):
+        cf = CashFlow(self.sd, 100.00, self.ts)
+        projection = cf.project(horizon_days=400)
+        self.assertTrue(np.array_equal(
+            projection.balances,
+            CashFlow(self.sd, 100.00, self.memory).project(
+                horizon_days=400).balances))
+        self.ts.getTransaction("Monthly")[0].updateAmount(-10.00)
+        self.ts.removeTransactions(self.ts.getTransaction("Once")[0])
+        projection.sync(self.ts)
+        self.assertTrue(np.array_equal(
+            projection.balances, cf.project(horizon_days=400).balances))
+
+    def test_load_yaml(self):
+        yaml_path = os.path.join(self.directory.name, 'book.yml')
+        self.memory.saveTransactions(yaml_path)
+        self.ts.addTransactions(Transaction(start=self.sd, description="X"))
+        self.ts.loadTransactions(yaml_path)
+        self.assertEqual(self.ids(self.ts.getTransactions()),
+                         self.ids(self.memory.getTransactions()))
+
+    def test_save_yaml(self):
+        yaml_path = os.path.join(self.directory.name, 'backup.yml')
+        self.ts.getTransaction("Monthly")[0].updateAmount(-10.00)
+        self.ts.saveTransactions(yaml_path)
+        loaded = TransactionStore()
+        loaded.loadTransactions(yaml_path)
+        self.assertEqual(self.ids(loaded.getTransactions()),
+                         self.ids(self.ts.getTransactions()))
+        self.assertEqual(loaded.getTransaction("Monthly")[0].amount, -10.00)
+
+
+if __name__ == '__main__':
+    unittest.main()
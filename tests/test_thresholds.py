@@ -0,0 +1,62 @@
+#!/bin/env python
+import unittest
+from datetime import date, timedelta
+import context
+from cash_flow.transaction import Transaction
+from cash_flow.transaction_store import TransactionStore
+from cash_flow.cash_flow import CashFlow
+from cash_flow.money import Money
+from cash_flow.thresholds import intervalsBelow, inIntervals
+
+
+class TestIntervalsBelow(unittest.TestCase):
+    def setUp(self):
+        self.sd = date(2021, 3, 1)
+        ts = TransactionStore()
+        ts.addTransactions(
+            Transaction(start=self.sd+timedelta(days=2), description="Rent",
+                        amount=-150.00, frequency=Transaction.ONCE),
+            Transaction(start=self.sd+timedelta(days=5), description="Pay",
+                        amount=100.00, frequency=Transaction.ONCE),
+            Transaction(start=self.sd+timedelta(days=8), description="Car",
+                        amount=-200.00, frequency=Transaction.ONCE))
+        # 120 120 -30 -30 -30 70 70 70 -130 -130
+        self.p = CashFlow(self.sd, 120.00, ts).project(horizon_days=10)
+
+    def day(self, n):
+        return self.sd + timedelta(days=n)
+
+    def test_multiple_thresholds(self):
+        (warning, zero, low) = intervalsBelow(self.p, 100.00, 0, Money(-500))
+        self.assertEqual(warning, [(self.day(2), self.day(10))])
+        self.assertEqual(zero, [(self.day(2), self.day(5)),
+                                (self.day(8), self.day(10))])
+        self.assertEqual(low, [])
+
+    def test_below_from_start(self):
+        (intervals,) = intervalsBelow(self.p, 200.00)
+        self.assertEqual(intervals, [(self.day(0), self.day(10))])
+
+    def test_matches_daily_comparison(self):
+        for threshold in [-130, -30, 0, 70, 71, 120, 121]:
+            (intervals,) = intervalsBelow(self.p, threshold)
+            for i in range(10):
+                self.assertEqual(inIntervals(intervals, self.day(i)),
+                                 self.p.balances[i] < threshold * 100)
+
+    def test_no_thresholds(self):
+        self.assertEqual(intervalsBelow(self.p), [])
+
+
+class TestInIntervals(unittest.TestCase):
+    def test_boundaries(self):
+        intervals = [(date(2021, 1, 5), date(2021, 1, 8)),
+                     (date(2021, 1, 10), date(2021, 1, 11))]
+        inside = [d for d in range(1, 15)
+                  if inIntervals(intervals, date(2021, 1, d))]
+        self.assertEqual(inside, [5, 6, 7, 10])
+        self.assertFalse(inIntervals([], date(2021, 1, 1)))
+
+
+if __name__ == '__main__':
+    unittest.main()
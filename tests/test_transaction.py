@@ -88,6 +88,27 @@ class TestConstructor(unittest.TestCase):
         self.assertTrue(t.cleared)
 
 
+class TestId(unittest.TestCase):
+    def test_ids_are_unique(self):
+        ids = set(Transaction().id for i in range(100))
+        self.assertEqual(len(ids), 100)
+
+    def test_given_id(self):
+        t = Transaction(id="abc")
+        self.assertEqual(t.id, "abc")
+
+    def test_duplicate_gets_new_id(self):
+        t = Transaction()
+        self.assertNotEqual(t.duplicate().id, t.id)
+
+    def test_state_without_id_gets_one(self):
+        t = Transaction.__new__(Transaction)
+        state = Transaction().__getstate__()
+        del state['id']
+        t.__setstate__(state)
+        self.assertIsInstance(t.id, str)
+
+
 class TestDuplicateTransaction(unittest.TestCase):
     def setUp(self):
         sd = date.today()
@@ -346,6 +367,112 @@ class TestAnnualRecurrence(TestRecurrence):
                               self.yan, self.t.amount)
 
 
+class TestClosedFormRecurrence(unittest.TestCase):
+    # amtOn used to walk from start one step at a time; make sure the
+    # closed form agrees with that walk, especially around month ends.
+    def steppedAmtOn(self, t, trans_date):
+        d = t.start
+        while True:
+            if d not in t.skip:
+                if d == trans_date:
+                    return t.amount
+                if d > trans_date:
+                    return Money(0)
+                if t.end and trans_date > t.end:
+                    return Money(0)
+                if t.frequency == Transaction.ONCE:
+                    return Money(0)
+            d = t._step_to_next_date(d)
+
+    def assertMatchesStepping(self, t, days):
+        for i in range(-3, days):
+            d = t.start + timedelta(days=i)
+            self.assertEqual(t.amtOn(d), self.steppedAmtOn(t, d),
+                             f"{t.frequency} from {t.start} on {d}")
+
+    def test_month_end_starts(self):
+        starts = [date(2020, 1, 31), date(2020, 2, 29), date(2021, 3, 30),
+                  date(2019, 8, 29), date(2020, 11, 30), date(2021, 5, 15)]
+        freqs = [Transaction.MONTHLY, Transaction.QUARTERLY,
+                 Transaction.ANNUALLY]
+        for sd in starts:
+            for freq in freqs:
+                t = Transaction(start=sd, amount=1.00, frequency=freq)
+                self.assertMatchesStepping(t, 1500)
+
+    def test_weekly_starts(self):
+        for freq in [Transaction.WEEKLY, Transaction.BIWEEKLY]:
+            t = Transaction(start=date(2020, 2, 27), amount=1.00,
+                            frequency=freq)
+            self.assertMatchesStepping(t, 800)
+
+    def test_skip_and_end(self):
+        sd = date(2020, 1, 31)
+        for freq in Transaction.INTERVALS[1:]:
+            t = Transaction(start=sd, amount=1.00, frequency=freq,
+                            end=sd + timedelta(days=400),
+                            skip=set([sd + relativedelta(months=1),
+                                      sd + timedelta(days=14),
+                                      sd + relativedelta(months=12)]))
+            self.assertMatchesStepping(t, 900)
+
+    def test_skipped_start_with_early_end(self):
+        sd = date(2020, 1, 1)
+        t = Transaction(start=sd, amount=1.00,
+                        frequency=Transaction.WEEKLY,
+                        end=sd + timedelta(days=3),
+                        skip=set([sd]))
+        self.assertMatchesStepping(t, 30)
+
+
+class TestOccurrencesBetween(unittest.TestCase):
+    def assertMatchesAmtOn(self, t, first, last):
+        expected = []
+        d = first
+        while d <= last:
+            amt = t.amtOn(d)
+            if amt != 0:
+                expected.append((d, amt))
+            d += timedelta(days=1)
+        self.assertEqual(list(t.occurrencesBetween(first, last)), expected)
+
+    def test_all_frequencies(self):
+        sd = date(2020, 1, 31)
+        for freq in Transaction.INTERVALS:
+            t = Transaction(start=sd, amount=1.00, frequency=freq,
+                            skip=set([sd + timedelta(days=14),
+                                      sd + relativedelta(months=3)]))
+            self.assertMatchesAmtOn(t, sd - timedelta(days=5),
+                                    sd + timedelta(days=800))
+            self.assertMatchesAmtOn(t, sd + timedelta(days=100),
+                                    sd + timedelta(days=800))
+
+    def test_end_date(self):
+        sd = date(2021, 3, 30)
+        for freq in Transaction.INTERVALS[1:]:
+            t = Transaction(start=sd, amount=1.00, frequency=freq,
+                            end=sd + timedelta(days=200))
+            self.assertMatchesAmtOn(t, sd, sd + timedelta(days=600))
+        t = Transaction(start=sd, amount=1.00,
+                        frequency=Transaction.WEEKLY,
+                        end=sd + timedelta(days=3),
+                        skip=set([sd]))
+        self.assertMatchesAmtOn(t, sd, sd + timedelta(days=60))
+
+    def test_unbounded(self):
+        t = Transaction(start=date(2020, 1, 1), amount=1.00,
+                        frequency=Transaction.MONTHLY)
+        occurrences = t.occurrencesBetween(date(2030, 1, 15))
+        self.assertEqual(next(occurrences)[0], date(2030, 2, 1))
+        self.assertEqual(next(occurrences)[0], date(2030, 3, 1))
+
+    def test_empty_range(self):
+        t = Transaction(start=date(2020, 1, 1), amount=1.00,
+                        frequency=Transaction.ONCE)
+        self.assertEqual(list(t.occurrencesBetween(date(2020, 1, 2),
+                                                   date(2020, 2, 1))), [])
+
+
 class TestOneTimeTransactionHits(unittest.TestCase):
     def setUp(self):
         self.sd = date.today()
@@ -417,6 +544,58 @@ class TestStartDateChange(unittest.TestCase):
         self.assertEqual(self.t2.original_start, self.sd)
 
 
+class TestObservers(unittest.TestCase):
+    def setUp(self):
+        self.t = Transaction(
+            start=date(2021, 1, 1),
+            description="Test",
+            amount=1.02)
+        self.changes = []
+        self.t.addObserver(self.observe)
+
+    def observe(self, t, field, old):
+        self.changes.append((t, field, old))
+
+    def test_field_change_is_reported(self):
+        self.t.description = "Changed"
+        self.t.updateAmount(2.00)
+        self.assertEqual(self.changes, [(self.t, "description", "Test"),
+                                        (self.t, "amount", Money(1.02))])
+
+    def test_removed_observer_is_silent(self):
+        self.t.removeObserver(self.observe)
+        self.t.description = "Changed"
+        self.assertEqual(self.changes, [])
+
+    def test_observers_are_not_copied(self):
+        t2 = self.t.duplicate()
+        t2.description = "Changed"
+        self.assertEqual(self.changes, [])
+        self.assertNotIn('_observers', self.t.__getstate__())
+
+
+class TestActiveRange(unittest.TestCase):
+    def test_once(self):
+        t = Transaction(start=date(2021, 1, 1))
+        self.assertEqual(t.activeRange(),
+                         (date(2021, 1, 1), date(2021, 1, 1)))
+
+    def test_recurring(self):
+        t = Transaction(start=date(2021, 1, 1),
+                        frequency=Transaction.MONTHLY)
+        self.assertEqual(t.activeRange(), (date(2021, 1, 1), None))
+        t.end = date(2021, 6, 1)
+        self.assertEqual(t.activeRange(),
+                         (date(2021, 1, 1), date(2021, 6, 1)))
+
+    def test_skipped_start_past_end(self):
+        t = Transaction(start=date(2021, 1, 1), end=date(2021, 1, 3),
+                        frequency=Transaction.WEEKLY,
+                        skip=set([date(2021, 1, 1)]))
+        self.assertEqual(t.activeRange(),
+                         (date(2021, 1, 1), date(2021, 1, 8)))
+
+
 class TestUpdateAmount(unittest.TestCase):
     def setUp(self):
         self.t = Transaction(
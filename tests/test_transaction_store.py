@@ -23,7 +23,7 @@ class TestBasicCreate(unittest.TestCase):
             frequency=Transaction.ONCE)
         ts.addTransactions(t)
         self.assertEqual(len(ts.store), 1)
-        t = next((t for t in ts.store if t.amount == 1.00),
+        t = next((t for t in ts.store.values() if t.amount == 1.00),
                  None)
         self.assertIsNotNone(t)
         self.assertEqual(t.start, d)
@@ -58,7 +58,7 @@ class TestBasicCreate(unittest.TestCase):
 
         ts.addTransactions(t1, t2, t3)
 
-        t = next((t for t in ts.store if t.amount == 1.00),
+        t = next((t for t in ts.store.values() if t.amount == 1.00),
                  None)
         self.assertIsNotNone(t)
         self.assertEqual(t.start, d)
@@ -66,7 +66,7 @@ class TestBasicCreate(unittest.TestCase):
         self.assertEqual(t.amount, 1.00)
         self.assertEqual(t.frequency, Transaction.ONCE)
 
-        t = next((t for t in ts.store if t.amount == 1.01),
+        t = next((t for t in ts.store.values() if t.amount == 1.01),
                  None)
         self.assertIsNotNone(t)
         self.assertEqual(t.start, d+timedelta(days=2))
@@ -74,7 +74,7 @@ class TestBasicCreate(unittest.TestCase):
         self.assertEqual(t.amount, 1.01)
         self.assertEqual(t.frequency, Transaction.ONCE)
 
-        t = next((t for t in ts.store if t.amount == 1.02),
+        t = next((t for t in ts.store.values() if t.amount == 1.02),
                  None)
         self.assertIsNotNone(t)
         self.assertEqual(t.start, d)
@@ -148,11 +148,12 @@ class TestTransactionListRetrieval(unittest.TestCase):
             description="Annually 2",
             amount=1.12,
             frequency=Transaction.ANNUALLY)
+        transactions = [self.o1, self.o2, self.w1, self.w2,
+                        self.bw1, self.bw2, self.m1, self.m2,
+                        self.q1, self.q2, self.a1, self.a2]
+        random.shuffle(transactions)
         self.ts = TransactionStore()
-        self.ts.addTransactions(self.o1, self.o2, self.w1, self.w2,
-                                self.bw1, self.bw2, self.m1, self.m2,
-                                self.q1, self.q2, self.a1, self.a2)
-        random.shuffle(self.ts.store)
+        self.ts.addTransactions(*transactions)
 
     def _transaction_list_test(self, transactions, expected_transactions):
         self.assertEqual(len(transactions), len(expected_transactions))
@@ -161,7 +162,8 @@ class TestTransactionListRetrieval(unittest.TestCase):
 
     def test_get_all_transations(self):
         transactions = self.ts.getTransactions()
-        self._transaction_list_test(transactions, self.ts.store)
+        self._transaction_list_test(transactions,
+                                    list(self.ts.store.values()))
 
     def test_get_one_time_transactions(self):
         transactions = self.ts.getTransactions(frequency=Transaction.ONCE)
@@ -333,6 +335,150 @@ class TestRetrieveFromMultipleRecurringTransactions(unittest.TestCase):
         self.assertEqual(len(t_list), 0)
 
 
+class TestIndexes(unittest.TestCase):
+    def setUp(self):
+        self.sd = date(2021, 3, 1)
+        self.once = Transaction(
+            start=self.sd+timedelta(days=5),
+            description="Once",
+            amount=1.00,
+            frequency=Transaction.ONCE)
+        self.weekly = Transaction(
+            start=self.sd,
+            end=self.sd+timedelta(days=60),
+            description="Weekly",
+            amount=1.02,
+            frequency=Transaction.WEEKLY)
+        self.monthly = Transaction(
+            start=self.sd+timedelta(days=20),
+            description="Monthly",
+            amount=1.03,
+            frequency=Transaction.MONTHLY)
+        self.ts = TransactionStore()
+        self.ts.addTransactions(self.once, self.weekly, self.monthly)
+
+    def test_description_change_follows_transaction(self):
+        self.weekly.description = "Renamed"
+        self.assertEqual(self.ts.getTransaction("Weekly"), [])
+        self.assertEqual(self.ts.getTransaction("Renamed"), [self.weekly])
+
+    def test_frequency_change_follows_transaction(self):
+        self.once.frequency = Transaction.MONTHLY
+        self.assertEqual(self.ts.getTransactions(Transaction.ONCE), [])
+        self.assertEqual(self.ts.getTransactions(Transaction.MONTHLY),
+                         [self.once, self.monthly])
+
+    def test_removed_transaction_is_unindexed(self):
+        self.ts.removeTransactions(self.weekly)
+        self.assertEqual(self.ts.getTransaction("Weekly"), [])
+        self.assertEqual(self.ts.getTransactions(Transaction.WEEKLY), [])
+        self.assertNotIn(self.weekly,
+                         self.ts.getActiveTransactions(self.sd))
+        self.weekly.description = "Gone"
+        self.assertEqual(self.ts.getTransaction("Gone"), [])
+
+    def test_lookups_keep_store_order_after_edits(self):
+        rng = random.Random(3)
+        for i in range(30):
+            self.ts.addTransactions(Transaction(
+                start=self.sd, description=rng.choice("abc"),
+                amount=1.00, frequency=rng.choice(Transaction.INTERVALS)))
+        for _ in range(60):
+            t = rng.choice(self.ts.getTransactions())
+            if rng.random() < 0.5:
+                t.description = rng.choice("abc")
+            else:
+                t.frequency = rng.choice(Transaction.INTERVALS)
+        transactions = self.ts.getTransactions()
+        for description in "abc":
+            self.assertEqual(self.ts.getTransaction(description),
+                             [t for t in transactions
+                              if t.description == description])
+        for frequency in Transaction.INTERVALS:
+            self.assertEqual(self.ts.getTransactions(frequency),
+                             [t for t in transactions
+                              if t.frequency == frequency])
+
+    def test_replace(self):
+        new = self.monthly.duplicate()
+        new.description = "Monthly 2"
+        self.ts.replaceTransaction(self.monthly, new)
+        self.assertEqual(self.ts.getTransaction("Monthly"), [])
+        self.assertEqual(self.ts.getTransaction("Monthly 2"), [new])
+        self.assertEqual(self.ts.getTransactions(Transaction.MONTHLY),
+                         [new])
+
+    def test_active_on_date(self):
+        self.assertEqual(self.ts.getActiveTransactions(self.sd),
+                         [self.weekly])
+        self.assertEqual(
+            self.ts.getActiveTransactions(self.sd+timedelta(days=5)),
+            [self.once, self.weekly])
+        self.assertEqual(
+            self.ts.getActiveTransactions(self.sd+timedelta(days=100)),
+            [self.monthly])
+
+    def test_active_in_range(self):
+        self.assertEqual(
+            self.ts.getActiveTransactions(self.sd+timedelta(days=6),
+                                          self.sd+timedelta(days=30)),
+            [self.weekly, self.monthly])
+        self.assertEqual(
+            self.ts.getActiveTransactions(self.sd-timedelta(days=30),
+                                          self.sd-timedelta(days=1)),
+            [])
+
+    def test_active_follows_date_changes(self):
+        self.weekly.end = None
+        self.assertIn(self.weekly, self.ts.getActiveTransactions(
+            self.sd+timedelta(days=1000)))
+        self.ts.updateRecurringStartDates(self.sd+timedelta(days=200))
+        self.assertEqual(self.ts.getActiveTransactions(
+            self.sd+timedelta(days=100)), [])
+
+    def test_purge(self):
+        self.ts.purgeSingleBefore(self.sd+timedelta(days=6))
+        self.assertEqual(self.ts.getTransactions(Transaction.ONCE), [])
+        self.assertEqual(self.ts.getTransaction("Once"), [])
+        self.assertEqual(
+            self.ts.getActiveTransactions(self.sd+timedelta(days=5)),
+            [self.weekly])
+
+    def test_active_matches_scan_after_edits(self):
+        # An early open-ended transaction mustn't hide or drag in others
+        rng = random.Random(7)
+        self.monthly.start = self.sd - timedelta(days=400)
+        for i in range(200):
+            start = self.sd + timedelta(days=rng.randrange(-200, 200))
+            end = None
+            if rng.random() < 0.7:
+                end = start + timedelta(days=rng.randrange(0, 120))
+            self.ts.addTransactions(Transaction(
+                start=start, end=end, description=str(i), amount=1.00,
+                frequency=rng.choice([Transaction.ONCE,
+                                      Transaction.WEEKLY,
+                                      Transaction.MONTHLY])))
+        transactions = self.ts.getTransactions()
+        for t in rng.sample(transactions, 40):
+            t.end = t.start + timedelta(days=rng.randrange(0, 60))
+        for t in rng.sample(transactions, 20):
+            t.end = None
+        self.ts.removeTransactionsFrom(rng.sample(transactions, 30))
+
+        def scan(first, last):
+            found = []
+            for t in self.ts.getTransactions():
+                (start, end) = t.activeRange()
+                if start <= last and (end is None or end >= first):
+                    found.append(t)
+            return found
+        for _ in range(50):
+            first = self.sd + timedelta(days=rng.randrange(-250, 250))
+            last = first + timedelta(days=rng.randrange(0, 60))
+            self.assertEqual(self.ts.getActiveTransactions(first, last),
+                             scan(first, last))
+
+
 # UPDATE (replace old with new)
 class TestBasicUpdate(unittest.TestCase):
     def setUp(self):
@@ -443,11 +589,107 @@ class TestBasicDelete(unittest.TestCase):
         self.assertEqual(len(t_list), 0)
 
 
+class TestIds(unittest.TestCase):
+    def setUp(self):
+        self.transactions = [Transaction(start=date.today(),
+                                         description=f"Once {i}",
+                                         amount=i)
+                             for i in range(10)]
+        self.ts = TransactionStore()
+        self.ts.addTransactionsFrom(iter(self.transactions))
+
+    def test_insertion_order(self):
+        self.assertEqual(self.ts.getTransactions(), self.transactions)
+        self.assertEqual(list(self.ts.store),
+                         [t.id for t in self.transactions])
+
+    def test_lookup_by_id(self):
+        t = self.transactions[3]
+        self.assertIs(self.ts.getTransactionById(t.id), t)
+        self.assertTrue(self.ts.hasTransaction(t))
+        self.assertIsNone(self.ts.getTransactionById("missing"))
+        self.assertFalse(self.ts.hasTransaction(t.duplicate()))
+
+    def test_bulk_remove(self):
+        missing = Transaction(description="Missing")
+        self.ts.removeTransactionsFrom(
+            [self.transactions[0], missing, self.transactions[5]])
+        self.assertEqual(len(self.ts.store), 8)
+        self.assertFalse(self.ts.hasTransaction(self.transactions[0]))
+        self.assertFalse(self.ts.hasTransaction(self.transactions[5]))
+        self.assertEqual(self.ts.getTransaction("Once 5"), [])
+
+    def test_readding_same_id_replaces(self):
+        t = self.transactions[2]
+        same = Transaction(start=t.start, description="Renamed",
+                           amount=t.amount, id=t.id)
+        self.ts.addTransactions(same)
+        self.assertEqual(len(self.ts.store), 10)
+        self.assertIs(self.ts.getTransactionById(t.id), same)
+        self.assertEqual(self.ts.getTransaction("Once 2"), [])
+        self.assertEqual(self.ts.getTransaction("Renamed"), [same])
+
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        self.ts = TransactionStore(journal_length=5)
+        self.t1 = Transaction(description="One", amount=1.00)
+        self.t2 = Transaction(description="Two", amount=2.00)
+        self.changes = []
+        self.ts.subscribe(self.record)
+
+    def record(self, store, change):
+        self.changes.append(change)
+
+    def test_add_remove_modify(self):
+        self.assertEqual(self.ts.version, 0)
+        self.ts.addTransactions(self.t1, self.t2)
+        self.t1.updateAmount(3.00)
+        self.ts.removeTransactions(self.t2)
+        self.assertEqual(self.ts.version, 4)
+        self.assertEqual(
+            [(c.kind, c.transaction_id) for c in self.changes],
+            [(TransactionStore.ADDED, self.t1.id),
+             (TransactionStore.ADDED, self.t2.id),
+             (TransactionStore.MODIFIED, self.t1.id),
+             (TransactionStore.REMOVED, self.t2.id)])
+        self.assertEqual(self.ts.changesSince(0), self.changes)
+        self.assertEqual(self.ts.changesSince(2), self.changes[2:])
+        self.assertEqual(self.ts.changesSince(4), [])
+
+    def test_untracked_changes(self):
+        self.ts.addTransactions(self.t1)
+        self.ts.removeTransactions(self.t2)
+        self.t2.description = "Not in store"
+        self.ts.removeTransactions(self.t1)
+        self.t1.description = "Removed"
+        self.assertEqual(self.ts.version, 2)
+
+    def test_replace(self):
+        self.ts.addTransactions(self.t1)
+        self.ts.replaceTransaction(self.t1, self.t2)
+        self.assertEqual([c.kind for c in self.ts.changesSince(1)],
+                         [TransactionStore.REMOVED, TransactionStore.ADDED])
+
+    def test_journal_is_bounded(self):
+        for i in range(8):
+            self.ts.addTransactions(Transaction(amount=i))
+        self.assertEqual(len(self.ts.journal), 5)
+        self.assertIsNone(self.ts.changesSince(2))
+        self.assertEqual(len(self.ts.changesSince(3)), 5)
+
+    def test_unsubscribe(self):
+        self.ts.unsubscribe(self.record)
+        self.ts.addTransactions(self.t1)
+        self.assertEqual(self.changes, [])
+        self.assertEqual(self.ts.version, 1)
+
+
 # MISC
 class TestConstructor(unittest.TestCase):
     def test_constructor(self):
         ts = TransactionStore()
-        self.assertIsInstance(ts.store, list)
+        self.assertIsInstance(ts.store, dict)
 
 
 class TestFileOperations(unittest.TestCase):
@@ -471,8 +713,7 @@ class TestFileOperations(unittest.TestCase):
             cleared=True)
 
         self.ts = TransactionStore()
-        self.ts.store.append(t1)
-        self.ts.store.append(t2)
+        self.ts.addTransactions(t1, t2)
 
     def tearDown(self):
         os.remove(self.file)
@@ -491,11 +732,11 @@ class TestFileOperations(unittest.TestCase):
     def test_file_operations(self):
         self.assertEqual(len(self.ts.store), 2)
 
-        t1 = next((t for t in self.ts.store if t.amount == 1.00),
+        t1 = next((t for t in self.ts.store.values() if t.amount == 1.00),
                   None)
         self.assertIsNotNone(t1)
 
-        t2 = next((t for t in self.ts.store if t.amount == 1.02),
+        t2 = next((t for t in self.ts.store.values() if t.amount == 1.02),
                   None)
         self.assertIsNotNone(t2)
 
@@ -506,16 +747,21 @@ class TestFileOperations(unittest.TestCase):
 
         self.assertEqual(len(ts.store), 2)
 
-        t1_l = next((t for t in ts.store if t.amount == 1.00),
+        t1_l = next((t for t in ts.store.values() if t.amount == 1.00),
                     None)
         self.assertIsNotNone(t1_l)
         self.assertTransactionsEqual(t1_l, t1)
 
-        t2_l = next((t for t in ts.store if t.amount == 1.02),
+        t2_l = next((t for t in ts.store.values() if t.amount == 1.02),
                     None)
         self.assertIsNotNone(t2_l)
         self.assertTransactionsEqual(t2_l, t2)
 
+        self.assertEqual(t1_l.id, t1.id)
+        self.assertEqual(t2_l.id, t2.id)
+        self.assertEqual(ts.getTransaction("Weekly"), [t2_l])
+        self.assertEqual(ts.getTransactions(Transaction.ONCE), [t1_l])
+
 
 class TestUtilityFunctions(unittest.TestCase):
     def setUp(self):
@@ -574,7 +820,7 @@ class TestUtilityFunctions(unittest.TestCase):
         self.ts.purgeSingleBefore(purge_date)
         self.assertEqual(len(self.ts.store), 3)
         exp_set = set([self.t2, self.t3, self.t4])
-        act_set = set(self.ts.store)
+        act_set = set(self.ts.store.values())
         self.assertEqual(exp_set.symmetric_difference(act_set), set())
         t_list = self.ts.getTransaction("Once, in two days")
         self.assertEqual(len(t_list), 1)
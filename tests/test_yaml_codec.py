@@ -0,0 +1,111 @@
+#!/bin/env python
+import unittest
+import io
+import yaml
+from datetime import date
+import context
+from cash_flow.transaction import Transaction
+from cash_flow.money import Money
+from cash_flow.app_settings import AppSettings
+from cash_flow import yaml_codec
+
+
+# As written by yaml.dump before there was a schema
+LEGACY_TRANSACTIONS = """\
+- !!python/object:cash_flow.transaction.Transaction
+  amount: !!python/object:cash_flow.money.Money
+    value: !!python/object/apply:decimal.Decimal
+    - '-12.34'
+  cleared: false
+  description: Power
+  end: null
+  frequency: M
+  original_start: &id001 2021-01-15
+  scheduled: true
+  skip: !!set
+    2021-02-15: null
+  start: *id001
+"""
+
+LEGACY_SETTINGS = """\
+!!python/object:__main__.AppSettings
+dataFile: /home/me/data/book.yml
+startBalance: '250.00'
+startDate: 2021-05-30
+warning: 100.0
+"""
+
+
+class TestYamlCodec(unittest.TestCase):
+    def test_round_trip(self):
+        t = Transaction(start=date(2021, 1, 29), end=date(2022, 1, 1),
+                        description="Pay", amount=1250.55,
+                        frequency=Transaction.BIWEEKLY,
+                        skip=set([date(2021, 2, 12)]), scheduled=True,
+                        amount_stddev=10.00, date_jitter=2)
+        text = yaml_codec.dumpTransactions([t, t.duplicate()])
+        self.assertNotIn('!!python', text)
+        document = yaml.safe_load(text)
+        self.assertEqual(document['version'], yaml_codec.FORMAT_VERSION)
+        self.assertEqual(document['transactions'][0]['amount'], '1250.55')
+        (loaded, copy) = yaml_codec.loadTransactions(io.StringIO(text))
+        self.assertEqual(yaml_codec.transactionToDict(loaded),
+                         yaml_codec.transactionToDict(t))
+        self.assertNotEqual(copy.id, t.id)
+
+    def test_legacy_transactions(self):
+        (t,) = yaml_codec.loadTransactions(LEGACY_TRANSACTIONS)
+        self.assertEqual(t.amount, Money('-12.34'))
+        self.assertEqual(t.start, date(2021, 1, 15))
+        self.assertEqual(t.skip, set([date(2021, 2, 15)]))
+        self.assertTrue(t.scheduled)
+        self.assertEqual(len(t.id), 32)
+        self.assertEqual((t.amount_stddev, t.date_jitter), (0, 0))
+        self.assertIsNone(yaml_codec.loadSnapshot(LEGACY_TRANSACTIONS)[1])
+        # Saving migrates to the schema
+        again = yaml_codec.loadTransactions(
+            yaml_codec.dumpTransactions([t]))
+        self.assertEqual(yaml_codec.transactionToDict(again[0]),
+                         yaml_codec.transactionToDict(t))
+
+    def test_settings(self):
+        legacy = yaml_codec.loadSettings(LEGACY_SETTINGS)
+        self.assertIsInstance(legacy, AppSettings)
+        self.assertEqual(legacy.startDate, date(2021, 5, 30))
+        self.assertEqual(legacy.dataFile, '/home/me/data/book.yml')
+        text = yaml_codec.dumpSettings(legacy)
+        self.assertNotIn('!!python', text)
+        loaded = yaml_codec.loadSettings(text)
+        self.assertEqual(vars(loaded), vars(legacy))
+
+    def test_refuses_other_objects(self):
+        with self.assertRaises(yaml.YAMLError):
+            yaml_codec.loadTransactions(
+                "- !!python/object/apply:os.system ['echo hi']")
+        with self.assertRaises(yaml.YAMLError):
+            yaml_codec.loadTransactions("- !!python/object:os.Foo {}")
+
+    def test_versions(self):
+        self.assertEqual(yaml_codec.loadTransactions(""), [])
+        with self.assertRaises(ValueError):
+            yaml_codec.loadTransactions("version: 99\ntransactions: []\n")
+        yaml_codec.MIGRATIONS[0] = lambda document: {
+            'version': 1,
+            'transactions': [{'start': t['start'],
+                              'description': t['name']}
+                             for t in document['items']]}
+        try:
+            (t,) = yaml_codec.loadTransactions(
+                "version: 0\nitems: [{start: 2021-01-01, name: Old}]\n")
+        finally:
+            del yaml_codec.MIGRATIONS[0]
+        self.assertEqual(t.description, "Old")
+
+    def test_uses_libyaml_when_available(self):
+        if getattr(yaml, '__with_libyaml__', False):
+            self.assertTrue(issubclass(yaml_codec.Loader, yaml.CSafeLoader))
+            self.assertIs(yaml_codec.Dumper, yaml.CSafeDumper)
+
+
+if __name__ == '__main__':
+    unittest.main()